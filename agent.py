@@ -1,15 +1,126 @@
-import random
-import pickle
+from collections import deque
+
 import numpy as np
 
+from model_io import (
+    EXTENSION, is_binary_model, load_model, read_pickle_data, save_model,
+    write_pickle_model,
+)
+from q_table import STORAGES, decode_state, encode_state
+from rng import make_rng
+from symmetry import (
+    INVERSES, TRANSFORMS, canonical_state, fold_q_table, fold_visits,
+)
+
+# Agent state saved with the Q-table, so training can be resumed
+META_KEYS = (
+    "lr", "gamma", "epsilon", "epsilon_min", "epsilon_decay", "sessions",
+    "symmetry",
+)
+
+# Q-values types of the array storages: integer types would truncate the
+# updates
+Q_DTYPES = ("float32", "float16")
+
+# Learning rules: one-step Q-learning, n-step returns, Watkins Q(lambda)
+RULES = ("q", "nstep", "watkins")
+
+# Longest eligibility trace kept, whatever gamma * lam
+MAX_TRACE_LENGTH = 1000
+
+
+def get_state_tuple(vision_dict):
+    res = []
+    for direction in ["UP", "DOWN", "LEFT", "RIGHT"]:
+        res.extend(vision_dict[direction])
+    return tuple(res)
+
 
 class Agent:
     q_table: dict[tuple[int, ...], list[float]]
     actions: list[int]
 
-    def __init__(self) -> None:
-        self.q_table = {}
+    def __init__(
+        self,
+        storage: str = "dict",
+        dtype: str = "float32",
+        replay=None,
+        batch_size: int = 256,
+        replay_every: int = 32,
+        rule: str = "q",
+        n_steps: int = 3,
+        lam: float = 0.3,
+        trace_min: float = 0.01,
+        rng=None,
+        symmetry: bool = False,
+    ) -> None:
+        """
+        replay (a replay.ReplayBuffer) makes learn store the transitions
+        and apply a batch of batch_size sampled transitions every
+        replay_every steps, instead of one update per step.
+        It needs an array storage ("dense" or "sparse").
+        rule selects the update: "q" (one step), "nstep" (the return of
+        the next n_steps rewards, then the best Q-value) or "watkins"
+        (Q(lam) with replacing traces, cut after an exploratory action).
+        Traces smaller than trace_min are dropped.
+        rng is the source of the exploration draws (see rng.make_rng).
+        symmetry stores one row for the 8 rotations and reflections of a
+        state: states and actions are moved to a canonical form before
+        every lookup and update (see symmetry.canonical_state).
+        """
         self.actions = [0, 1, 2, 3]  # UP, DOWN, LEFT, RIGHT
+        self.rng = make_rng(rng)
+        self.symmetry = symmetry
+
+        # Stockage : "dict" (tuple -> liste), "dense" ou "sparse" (tableaux
+        # NumPy indexés par l'état encodé en base 4)
+        if storage != "dict" and storage not in STORAGES:
+            raise ValueError(
+                f"Invalid storage '{storage}'. "
+                f"Use 'dict', {', '.join(repr(s) for s in STORAGES)}."
+            )
+        if dtype not in Q_DTYPES:
+            raise ValueError(
+                f"Invalid dtype '{dtype}'. "
+                f"Use {', '.join(repr(d) for d in Q_DTYPES)}."
+            )
+        self.storage = storage
+        self.dtype = dtype
+        self.q_table = self._new_q_table()
+        # Nombre de mises à jour de chaque état (voir get_visits)
+        self.visits: dict = {}
+
+        # Rejeu d'expérience : mises à jour par lots vectorisés
+        if replay is not None and storage == "dict":
+            raise ValueError(
+                "Experience replay needs the 'dense' or 'sparse' storage."
+            )
+        self.replay = replay
+        self.batch_size = batch_size
+        self.replay_every = replay_every
+        self._steps = 0
+
+        # Règle d'apprentissage
+        if rule not in RULES:
+            raise ValueError(
+                f"Invalid rule '{rule}'. "
+                f"Use {', '.join(repr(r) for r in RULES)}."
+            )
+        if rule != "q" and replay is not None:
+            raise ValueError("Experience replay only supports the 'q' rule.")
+        if n_steps < 1:
+            raise ValueError("n_steps must be at least 1.")
+        self.rule = rule
+        self.n_steps = n_steps
+        self.lam = lam
+        self.trace_min = trace_min
+        # n-step : (clé, action, récompense) des derniers pas non appris
+        self._pending: deque = deque()
+        # Watkins : (clé, action) -> pas de la dernière visite, dans
+        # l'ordre des visites (la plus ancienne en premier)
+        self._traces: dict = {}
+        self._decays: list[float] = [1.0]
+        self._time = 0
 
         # Hyperparamètres
         # Alpha : vitesse à laquelle l'IA remplace l'ancienne info
@@ -19,11 +130,120 @@ class Agent:
         self.epsilon = 1.0   # Taux d'exploration (100% au début)
         self.epsilon_min = 0.01
         self.epsilon_decay = 0.995  # Diminue le hasard à chaque partie
+        self.sessions = 0  # Nombre de parties apprises
+
+    def get_meta(self) -> dict:
+        """
+        Get the hyperparameters and training progress of the agent.
+        """
+        return {key: getattr(self, key) for key in META_KEYS}
+
+    def set_meta(self, meta: dict):
+        """
+        Restore the hyperparameters and training progress saved with a
+        model. Missing keys keep their current value.
+        """
+        for key in META_KEYS:
+            if key in meta:
+                setattr(self, key, type(getattr(self, key))(meta[key]))
+
+    def get_visits(self) -> dict[tuple[int, ...], int]:
+        """
+        Get how many times each state was updated, by state tuple
+        (the key format of the saved Q-tables).
+        """
+        visits: dict[tuple[int, ...], int] = {}
+        for state, count in self.visits.items():
+            if not isinstance(state, tuple):
+                state = decode_state(state)
+            visits[state] = visits.get(state, 0) + count
+        return visits
+
+    def set_visits(self, visits: dict):
+        """
+        Restore the visit counts saved with a model.
+        """
+        if self.storage in ("dict", "mapped"):
+            self.visits = dict(visits)
+        else:
+            self.visits = {
+                encode_state(state): count for state, count in visits.items()
+            }
+
+    def schedule_epsilon(self, nb_sessions: int):
+        """
+        Set epsilon_decay so that epsilon reaches epsilon_min after
+        nb_sessions games.
+        """
+        if nb_sessions > 0 and self.epsilon > 0:
+            self.epsilon_decay = (self.epsilon_min / self.epsilon) ** (
+                1.0 / nb_sessions
+            )
+
+    def _new_q_table(self):
+        """
+        Create an empty Q-table for the selected storage.
+        """
+        if self.storage == "dict":
+            return {}
+        return STORAGES[self.storage](len(self.actions), self.dtype)
+
+    def _slot(self, state) -> int:
+        """
+        Get the row of a state in an array Q-table.
+        The state can be a 12-tuple or its encoded integer.
+        """
+        if not isinstance(state, (int, np.integer)):
+            state = encode_state(state)
+        return self.q_table.slot(state)
+
+    def state_as_tuple(self) -> bool:
+        """
+        Check if states are given as 12-tuples (dict storage) rather than
+        as encoded integers (see Board.encode_state).
+        """
+        return self.storage == "dict"
+
+    def _key(self, state):
+        """
+        Get the key of a state's Q-values, creating them if not present:
+        the state itself for the dict storage, its row otherwise.
+        """
+        if self.storage == "dict":
+            self.get_q_values(state)
+            return state
+        return self._slot(state)
+
+    def _q(self, key):
+        """
+        Get the Q-values of a key (see _key), as a mutable row.
+        """
+        if self.storage == "dict":
+            return self.q_table[key]
+        return self.q_table.values[key]
 
-    def get_q_values(self, state: str) -> list[float]:
+    def get_q_values(self, state: str, create: bool = True) -> list[float]:
         """
         Get Q-values for a given state, initializing if not present.
+        Without create the table is left unchanged, and an unknown state
+        gets zeros (not stored).
         """
+        if self.storage == "mapped" or not create:
+            # Lecture seule : un état inconnu vaut 0 partout
+            if self.storage in ("dict", "mapped"):
+                q_values = self.q_table.get(state)
+            else:
+                if not isinstance(state, (int, np.integer)):
+                    state = encode_state(state)
+                row = self.q_table.get(state)
+                q_values = None if row is None else self.q_table.values[row]
+            if q_values is None:
+                q_values = np.zeros(len(self.actions), dtype=np.float32)
+            return q_values
+        if self.storage != "dict":
+            # La ligne d'abord : le tableau peut être réalloué par slot
+            row = self._slot(state)
+            return self.q_table.values[row]
         if state not in self.q_table:
             self.q_table[state] = [0.0 for _ in self.actions]
         return self.q_table[state]
@@ -31,17 +251,55 @@ class Agent:
     def choose_action(self, state):
         """
         Choose an action based on epsilon-greedy strategy.
+        The Q-table is only read: playing does not add states to it.
         """
-        if random.random() < self.epsilon:
-            return random.choice(self.actions)
+        # Un seul tirage : sous epsilon, draw / epsilon est aussi uniforme
+        # et choisit l'action d'exploration
+        draw = self.rng.random()
+        if draw < self.epsilon:
+            nb_actions = len(self.actions)
+            index = int(draw / self.epsilon * nb_actions)
+            return self.actions[min(index, nb_actions - 1)]
+        elif self.symmetry:
+            # Meilleure action de l'état canonique, ramenée sur le plateau
+            state, index = canonical_state(state)
+            q_values = self.get_q_values(state, create=False)
+            if self.storage != "dict":
+                return INVERSES[index][int(q_values.argmax())]
+            return INVERSES[index][int(np.argmax(q_values))]
+        elif self.storage != "dict":
+            return int(self.get_q_values(state, create=False).argmax())
         else:
-            q_values = self.get_q_values(state)
+            q_values = self.get_q_values(state, create=False)
             return np.argmax(q_values)
 
     def learn(self, old_state, action, reward, new_state, done):
         """
         Update Q-values based on the action taken and reward received.
         """
+        if self.storage == "mapped":
+            raise ValueError("Cannot learn on a memory-mapped Q-table.")
+        if self.symmetry:
+            # Toutes les règles apprennent sur les états canoniques ; le
+            # max de l'état suivant ne dépend pas de l'ordre des actions
+            old_state, index = canonical_state(old_state)
+            action = TRANSFORMS[index][action]
+            new_state = canonical_state(new_state)[0]
+        visits = self.visits
+        visits[old_state] = visits.get(old_state, 0) + 1
+        if self.replay is not None:
+            self._learn_replay(old_state, action, reward, new_state, done)
+            return
+        if self.rule == "nstep":
+            self._learn_nstep(old_state, action, reward, new_state, done)
+            return
+        if self.rule == "watkins":
+            self._learn_watkins(old_state, action, reward, new_state, done)
+            return
+        if self.storage != "dict":
+            self._learn_array(old_state, action, reward, new_state, done)
+            return
+
         q_values = self.get_q_values(old_state)
         old_q_value = q_values[action]
 
@@ -62,21 +320,210 @@ class Agent:
 
         # 5. Si la partie est finie, on réduit un peu le hasard (Epsilon Decay)
         if done:
-            if self.epsilon > self.epsilon_min:
-                self.epsilon *= self.epsilon_decay
+            self._end_session()
+
+    def _end_session(self):
+        """
+        Count a finished game and decay epsilon.
+        """
+        self.sessions += 1
+        if self.epsilon > self.epsilon_min:
+            self.epsilon *= self.epsilon_decay
+
+    def _learn_array(self, old_state, action, reward, new_state, done):
+        """
+        Same update as learn, on an array Q-table.
+        """
+        # Les deux lignes sont réservées avant de lire le tableau, qui peut
+        # être réalloué par le stockage "sparse"
+        new_row = None if done else self._slot(new_state)
+        old_row = self._slot(old_state)
+        values = self.q_table.values
+
+        max_future_q = 0.0 if done else float(values[new_row].max())
+        old_q_value = float(values[old_row, action])
+        bellman = reward + self.gamma * max_future_q - old_q_value
+        values[old_row, action] = old_q_value + self.lr * bellman
+
+        if done:
+            self._end_session()
+
+    def _learn_replay(self, old_state, action, reward, new_state, done):
+        """
+        Store the transition, and replay a batch every replay_every steps.
+        """
+        self.replay.add(old_state, action, reward, new_state, done)
+        self._steps += 1
+        if self._steps % self.replay_every == 0:
+            self.replay_batch()
+
+        if done:
+            self._end_session()
+
+    def _learn_nstep(self, old_state, action, reward, new_state, done):
+        """
+        n-step Q-learning: the Q-value of the action taken n_steps ago
+        moves toward the rewards received since, plus the discounted best
+        Q-value of the current state. At the end of a game the pending
+        actions learn their remaining rewards only.
+        """
+        pending = self._pending
+        pending.append((self._key(old_state), action, reward))
+        if done:
+            while pending:
+                self._apply_nstep(0.0)
+            self._end_session()
+        elif len(pending) >= self.n_steps:
+            new_key = self._key(new_state)
+            self._apply_nstep(float(max(self._q(new_key))))
+
+    def _apply_nstep(self, bootstrap: float):
+        """
+        Update the oldest pending action with the return of the pending
+        rewards followed by bootstrap.
+        """
+        target = bootstrap
+        for _, _, reward in reversed(self._pending):
+            target = reward + self.gamma * target
+        key, action, _ = self._pending.popleft()
+        q_values = self._q(key)
+        q_values[action] += self.lr * (target - q_values[action])
+
+    def _learn_watkins(self, old_state, action, reward, new_state, done):
+        """
+        Watkins Q(lambda): the temporal difference error updates every
+        action of the trace, weighted by (gamma * lam) ** age. The trace
+        is cut when the action taken was not the greedy one.
+        """
+        traces = self._traces
+        # Les deux clés avant de lire les valeurs (réallocation "sparse")
+        old_key = self._key(old_state)
+        new_key = None if done else self._key(new_state)
+        q_values = self._q(old_key)
+        if q_values[action] < max(q_values):
+            traces.clear()
+        if not traces:
+            self._time = 0
+            self._decays = self._trace_decays()
+
+        max_future_q = 0.0 if done else float(max(self._q(new_key)))
+        bellman = reward + self.gamma * max_future_q - q_values[action]
+        step = self.lr * bellman
+
+        traces.pop((old_key, action), None)
+        traces[(old_key, action)] = self._time
+        decays = self._decays
+        for (key, traced_action), time in traces.items():
+            self._q(key)[traced_action] += step * decays[self._time - time]
+
+        # Les traces trop anciennes sont en tête
+        self._time += 1
+        horizon = len(decays)
+        while traces:
+            oldest = next(iter(traces))
+            if self._time - traces[oldest] < horizon:
+                break
+            del traces[oldest]
+
+        if done:
+            traces.clear()
+            self._end_session()
+
+    def _trace_decays(self) -> list[float]:
+        """
+        Weights of a trace by age, (gamma * lam) ** age, down to
+        trace_min.
+        """
+        factor = self.gamma * self.lam
+        decays = [1.0]
+        while len(decays) < MAX_TRACE_LENGTH:
+            weight = decays[-1] * factor
+            if weight < self.trace_min:
+                break
+            decays.append(weight)
+        return decays
+
+    def replay_batch(self, batch_size: int | None = None):
+        """
+        Apply the Bellman update to a batch of sampled transitions at once.
+        Updates of the same state and action in a batch are averaged, so
+        a frequent entry does not move by more than lr.
+        """
+        (indexes, states, actions, rewards, next_states, dones,
+         weights) = self.replay.sample(batch_size or self.batch_size)
+        # Toutes les lignes sont réservées avant de lire le tableau
+        rows = self.q_table.slots(states)
+        alive = ~dones
+        next_rows = self.q_table.slots(next_states[alive])
+        values = self.q_table.values
+
+        max_future_q = np.zeros(len(rows))
+        max_future_q[alive] = values[next_rows].max(axis=1)
+        errors = rewards + self.gamma * max_future_q - values[rows, actions]
+        _, entries, counts = np.unique(
+            rows * values.shape[1] + actions, return_inverse=True,
+            return_counts=True,
+        )
+        np.add.at(
+            values, (rows, actions),
+            self.lr * weights * errors / counts[entries],
+        )
+        self.replay.update_priorities(indexes, errors)
 
     def save_q_table(self, filename: str):
         """
         Function to save the q_table to a file
+        (binary format if the name ends with .l2s, pickle otherwise).
+        Only pickle models keep the visit counts.
         """
-        with open(filename, 'wb') as f:
-            pickle.dump(self.q_table, f)
+        q_table = self.q_table
+        if self.storage != "dict":
+            q_table = q_table.to_dict()
+        if filename.endswith(EXTENSION):
+            save_model(filename, q_table, dtype=self.dtype,
+                       meta=self.get_meta())
+            return
+        write_pickle_model(
+            filename, q_table, self.get_meta(), self.get_visits()
+        )
 
-    def load_q_table(self, filename: str):
-        """ Function to load the q_table from a file """
+    def load_q_table(self, filename: str, mmap: bool = False):
+        """
+        Function to load the q_table from a file, with the hyperparameters
+        and training progress saved alongside it.
+        With mmap, a binary model stays on disk and the table is read-only.
+        A model learned without symmetry is folded onto the canonical
+        states if the agent uses symmetry (except when mapped, then the
+        model is used as it was learned).
+        """
+        symmetry = self.symmetry
         try:
-            with open(filename, 'rb') as f:
-                self.q_table = pickle.load(f)
+            if is_binary_model(filename):
+                mapped = load_model(filename, mmap=mmap)
+                self.set_meta(mapped.meta)
+                if mmap:
+                    self.storage = "mapped"
+                    self.q_table = mapped
+                    self.symmetry = bool(mapped.meta.get("symmetry", False))
+                    self.visits = {}
+                    print(f"Q_table {filename} mapped!")
+                    return
+                meta = mapped.meta
+                q_table = mapped.to_dict()
+                visits = {}
+            else:
+                q_table, meta, visits = read_pickle_data(filename)
+                self.set_meta(meta)
+            if symmetry and not meta.get("symmetry", False):
+                q_table = fold_q_table(q_table)
+                visits = fold_visits(visits)
+                self.symmetry = True
+            self.set_visits(visits)
+            if self.storage != "dict":
+                self.q_table = self._new_q_table()
+                self.q_table.update(q_table)
+            else:
+                self.q_table = q_table
             print(f"Q_table {filename} loaded!")
         except FileNotFoundError:
             print(f"{filename} not found. Starting with an empty Q-table.")
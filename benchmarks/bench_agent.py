@@ -0,0 +1,93 @@
+# benchmarks/bench_agent.py
+import random
+
+from agent import Agent, get_state_tuple
+from benchmarks.harness import CycleBoard, measure, seed
+from model_io import read_model
+from replay import ReplayBuffer
+
+
+def _load_states(model_path: str):
+    q_table = read_model(model_path)[0]
+    return q_table, list(q_table)
+
+
+def run(results, model_path: str, storages, scale: float = 1.0):
+    cycle = CycleBoard(10, 10)
+    vision = cycle.board.get_snake_vision()
+    results.add(
+        "get_state_tuple", {},
+        measure(lambda: get_state_tuple(vision), number=int(20000 * scale)),
+    )
+
+    q_table, states = _load_states(model_path)
+    for storage in storages:
+        params = {"storage": storage, "states": len(states)}
+        seed(0)
+        agent = Agent(storage=storage)
+        if storage == "dict":
+            agent.q_table = {s: list(q) for s, q in q_table.items()}
+        else:
+            agent.q_table.update(q_table)
+
+        picks = [random.choice(states) for _ in range(4096)]
+        position = [0]
+
+        def choose():
+            position[0] = (position[0] + 1) & 4095
+            agent.choose_action(picks[position[0]])
+
+        agent.epsilon = 0.0
+        results.add(
+            "agent.choose_action", params,
+            measure(choose, number=int(20000 * scale)),
+        )
+
+        transitions = [
+            (random.choice(states), random.randrange(4),
+             random.choice((-1, 10, -15, -100)), random.choice(states),
+             random.random() < 0.05)
+            for _ in range(4096)
+        ]
+        agent.epsilon = 1.0
+
+        def learn():
+            position[0] = (position[0] + 1) & 4095
+            agent.learn(*transitions[position[0]])
+
+        results.add(
+            "agent.learn", params,
+            measure(learn, number=int(20000 * scale)),
+        )
+
+        # States and actions moved to their canonical form first
+        agent.symmetry = True
+        results.add(
+            "agent.learn.symmetry", params,
+            measure(learn, number=int(20000 * scale)),
+        )
+        agent.epsilon = 0.0
+        results.add(
+            "agent.choose_action.symmetry", params,
+            measure(choose, number=int(20000 * scale)),
+        )
+
+        if storage == "dict":
+            continue
+        # Per transition, with the cost of the batches spread over them
+        for prioritized in (False, True):
+            replay = ReplayBuffer(50_000, prioritized=prioritized, seed=0)
+            for i in range(replay.capacity):
+                replay.add(*transitions[i & 4095])
+            replay_agent = Agent(storage=storage, replay=replay)
+            replay_agent.q_table.update(q_table)
+
+            def learn_replay():
+                position[0] = (position[0] + 1) & 4095
+                replay_agent.learn(*transitions[position[0]])
+
+            results.add(
+                "agent.learn.replay",
+                {**params, "prioritized": prioritized},
+                measure(learn_replay, number=int(20000 * scale)),
+            )
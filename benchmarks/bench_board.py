@@ -0,0 +1,65 @@
+# benchmarks/bench_board.py
+from benchmarks.harness import CycleBoard, measure
+
+
+def run(results, sizes, lengths, scale: float = 1.0):
+    for size in sizes:
+        for length in lengths:
+            if length >= size * size - 3:
+                continue
+            params = {"size": size, "length": length}
+            cycle = CycleBoard(size, length)
+            board = cycle.board
+
+            def step():
+                cycle.steer()
+                board.update()
+
+            # The snake may eat a few apples per batch, rebuild it each time
+            results.add(
+                "board.update", params,
+                measure(step, setup=cycle.rebuild, number=int(200 * scale)),
+            )
+
+            cycle.rebuild()
+            results.add(
+                "board.get_snake_vision", params,
+                measure(board.get_snake_vision, number=int(2000 * scale)),
+            )
+            results.add(
+                "board.encode_state", params,
+                measure(board.encode_state, number=int(2000 * scale)),
+            )
+
+            number = int(min(200, size * size - length - 10) * scale)
+
+            def add_food():
+                board.add_food("GREEN")
+
+            results.add(
+                "board.add_food", params,
+                measure(add_food, setup=cycle.rebuild, number=max(number, 1)),
+            )
+
+
+def run_vector(results, sizes, nb_games: int = 256, scale: float = 1.0):
+    import numpy as np
+
+    from vector_board import VectorBoard
+
+    for size in sizes:
+        vector_board = VectorBoard(nb_games, size, seed=0)
+        rng = np.random.default_rng(0)
+        actions = rng.integers(0, 4, size=(64, nb_games))
+        position = [0]
+
+        def step():
+            position[0] = (position[0] + 1) & 63
+            vector_board.step(actions[position[0]])
+            vector_board.reset(vector_board.get_dones())
+
+        stats = measure(step, number=int(200 * scale))
+        stats["game_steps_per_sec"] = stats["ops_per_sec"] * nb_games
+        results.add(
+            "vector_board.step", {"size": size, "games": nb_games}, stats
+        )
@@ -0,0 +1,84 @@
+# benchmarks/bench_episode.py
+import os
+
+from agent import Agent
+from benchmarks.harness import CycleBoard, measure, seed
+from trainer import train
+
+
+def run_episodes(results, sizes, sessions: int, scale: float = 1.0):
+    for size in sizes:
+        seed(0)
+        agent = Agent()
+        agent.epsilon = 0.1
+        agent.epsilon_decay = 1.0
+        steps = [0]
+
+        def count(step, reward):
+            steps[0] += 1
+
+        def episodes():
+            train(size, nb_sessions, agent=agent, save=False, on_step=count)
+
+        nb_sessions = max(1, int(sessions * scale))
+        stats = measure(episodes, number=1, repeat=3)
+        stats["steps_per_sec"] = (
+            steps[0] / 3 / (stats["mean_us"] / 1e6) if steps[0] else 0.0
+        )
+        stats["sessions_per_sec"] = nb_sessions * stats["ops_per_sec"]
+        results.add(
+            "train.episodes", {"size": size, "sessions": nb_sessions}, stats
+        )
+
+
+def run_render(results, sizes, lengths, scale: float = 1.0):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    try:
+        import pygame
+        from render import Renderer, ensure_screen, render
+    except ImportError:
+        print("pygame is not installed, skipping render benchmarks.")
+        return
+
+    pygame.init()
+    try:
+        for size in sizes:
+            screen = ensure_screen(size, 32)
+            for length in lengths:
+                if length >= size * size - 3:
+                    continue
+                params = {"size": size, "length": length}
+                cycle = CycleBoard(size, length)
+                board = cycle.board
+                results.add(
+                    "render.render", params,
+                    measure(
+                        lambda: render(board, screen, cell_size=32),
+                        number=int(100 * scale),
+                    ),
+                )
+
+                renderer = Renderer(screen, 32)
+                renderer.draw(board)
+                results.add(
+                    "render.renderer.idle", params,
+                    measure(
+                        lambda: renderer.draw(board),
+                        number=int(1000 * scale),
+                    ),
+                )
+
+                def step():
+                    cycle.steer()
+                    board.update()
+                    renderer.draw(board)
+
+                # One move per frame, board.update included
+                results.add(
+                    "render.renderer.step", params,
+                    measure(
+                        step, setup=cycle.rebuild, number=int(100 * scale)
+                    ),
+                )
+    finally:
+        pygame.quit()
@@ -0,0 +1,152 @@
+# benchmarks/harness.py
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+from time import perf_counter
+
+import numpy as np
+
+from board import Board
+from snake import Snake
+
+
+def seed(value: int = 0):
+    """
+    Seed every random generator used by the game and the agent.
+    """
+    random.seed(value)
+    np.random.seed(value)
+
+
+def measure(fn, setup=None, number: int = 1000, repeat: int = 5) -> dict:
+    """
+    Time number calls of fn, repeat times. setup() runs before each
+    batch and is not timed.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((perf_counter() - start) / number)
+    median = statistics.median(times)
+    return {
+        "calls": number * repeat,
+        "ops_per_sec": 1.0 / median if median > 0 else float("inf"),
+        "median_us": median * 1e6,
+        "mean_us": statistics.fmean(times) * 1e6,
+        "min_us": min(times) * 1e6,
+        "max_us": max(times) * 1e6,
+    }
+
+
+def hamiltonian_cycle(size: int) -> list[tuple]:
+    """
+    Cycle through every cell of an even-sized board: row 0 to the right,
+    zigzag over the other rows in columns 1..size-1, back up column 0.
+    """
+    if size % 2:
+        raise ValueError("The board size must be even.")
+    cycle = [(x, 0) for x in range(size)]
+    for y in range(1, size):
+        xs = range(size - 1, 0, -1) if y % 2 else range(1, size)
+        cycle.extend((x, y) for x in xs)
+    cycle.extend((0, y) for y in range(size - 1, 0, -1))
+    return cycle
+
+
+class CycleBoard:
+    """
+    Board whose snake has a given length and follows a Hamiltonian cycle,
+    so it can move forever without collision.
+    """
+
+    def __init__(self, size: int, length: int, seed_value: int = 0):
+        seed(seed_value)
+        self.size = size
+        self.length = length
+        self.cycle = hamiltonian_cycle(size)
+        self.next_direction = {}
+        names = {(0, -1): "UP", (0, 1): "DOWN", (-1, 0): "LEFT",
+                 (1, 0): "RIGHT"}
+        for i, (x, y) in enumerate(self.cycle):
+            nx, ny = self.cycle[(i + 1) % len(self.cycle)]
+            self.next_direction[(x, y)] = names[(nx - x, ny - y)]
+        self.board = Board(size)
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Put back a snake of the requested length and new food.
+        """
+        board = self.board
+        board.set_gameOver(False)
+        grid = board.get_grid()
+        grid.clear()
+        # Bench only: the snake is built by hand instead of set_snake
+        snake = Snake(self.cycle[2], "RIGHT", grid)
+        for position in self.cycle[3:self.length]:
+            snake.set_direction(self.next_direction[snake.get_body()[0]])
+            snake.eat("GREEN")
+            snake.move(position)
+        board._snake = snake
+        board._food = []
+        board.set_food()
+
+    def steer(self):
+        """
+        Point the snake to the next cell of the cycle.
+        """
+        snake = self.board.get_snake()
+        snake.set_direction(self.next_direction[snake.get_body()[0]])
+
+
+class Results:
+    """
+    Collect benchmark results and write them as JSON.
+    """
+
+    def __init__(self, verbose: bool = True):
+        self.verbose = verbose
+        self.entries = []
+
+    def add(self, name: str, params: dict, stats: dict):
+        self.entries.append({"name": name, "params": params, **stats})
+        if self.verbose:
+            args = " ".join(f"{k}={v}" for k, v in params.items())
+            print(
+                f"{name:28} {args:28}"
+                f" {stats['ops_per_sec']:>14,.0f} ops/s"
+                f" {stats['median_us']:>10.2f} us"
+            )
+
+    def write(self, filename: str):
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {"meta": _metadata(), "results": self.entries}
+        with open(filename, "w") as f:
+            json.dump(data, f, indent=2)
+
+
+def _metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+    }
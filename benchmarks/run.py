@@ -0,0 +1,66 @@
+# benchmarks/run.py
+import argparse
+import time
+
+from benchmarks import bench_agent, bench_board, bench_episode
+from benchmarks.harness import Results
+
+SUITES = ["board", "agent", "episode", "render"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the simulation and learning hot paths."
+    )
+    parser.add_argument(
+        "--only", choices=SUITES, action="append",
+        help="run only these suites (repeatable)",
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 20, 40],
+        help="even board sizes (default 10 20 40)",
+    )
+    parser.add_argument(
+        "--lengths", type=int, nargs="+", default=[3, 30, 300],
+        help="snake lengths (default 3 30 300)",
+    )
+    parser.add_argument(
+        "--model", default="models/q_table10000.pkl",
+        help="model whose states are used by the agent benchmarks",
+    )
+    parser.add_argument(
+        "--storages", nargs="+", default=["dict", "dense", "sparse"],
+        help="Q-table storages for the agent benchmarks",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="10x fewer calls"
+    )
+    parser.add_argument(
+        "--output", default=None,
+        help="JSON file (default benchmarks/results/<timestamp>.json)",
+    )
+    args = parser.parse_args(argv)
+
+    suites = args.only or SUITES
+    scale = 0.1 if args.quick else 1.0
+    results = Results()
+
+    if "board" in suites:
+        bench_board.run(results, args.sizes, args.lengths, scale)
+        bench_board.run_vector(results, args.sizes, scale=scale)
+    if "agent" in suites:
+        bench_agent.run(results, args.model, args.storages, scale)
+    if "episode" in suites:
+        bench_episode.run_episodes(results, args.sizes, 50, scale)
+    if "render" in suites:
+        bench_episode.run_render(results, args.sizes, args.lengths, scale)
+
+    output = args.output or time.strftime(
+        "benchmarks/results/%Y%m%d-%H%M%S.json"
+    )
+    results.write(output)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
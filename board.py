@@ -1,11 +1,50 @@
 # board.py
-import random
 from food import Food
+from occupancy import (
+    BODY, FOOD, FOOD_FLAGS, GREEN, HEAD, RED, OccupancyGrid
+)
+from rng import make_rng
 import snake
 
 # Toggle verbose debugging (disabled by default to avoid flooding the UI)
 DEBUG = False
 
+# Class of each cell flags for encode_state, so a ray is scanned with
+# bytes.find: B (body, stops the ray), G (green apple), R (red apple)
+_RAY_CLASSES = bytes(
+    ord("B") if flags & BODY
+    else ord("G") if flags & GREEN
+    else ord("R") if flags & RED
+    else ord(".")
+    for flags in range(256)
+)
+# Ray code (wall * 16 + green * 4 + red) -> its 3 vision buckets
+_RAY_DIGITS = [(code >> 4, (code >> 2) & 3, code & 3) for code in range(64)]
+# Cell flags of a ray, from the head to the wall -> ray code.
+# Few different rays occur in practice, the cache is emptied when full.
+_RAY_CODES: dict[bytes, int] = {}
+_RAY_CODES_SIZE = 1 << 16
+
+
+def _ray_code(ray: bytes) -> int:
+    """
+    Compute the code of a ray and cache it.
+    """
+    classes = ray.translate(_RAY_CLASSES)
+    end = classes.find(b"B")
+    if end < 0:
+        end = len(classes)
+    # find returns -1 when absent, so + 1 gives the distance or 0
+    code = (
+        Board.simplify_distance(end + 1) << 4
+        | Board.simplify_distance(classes.find(b"G", 0, end) + 1) << 2
+        | Board.simplify_distance(classes.find(b"R", 0, end) + 1)
+    )
+    if len(_RAY_CODES) >= _RAY_CODES_SIZE:
+        _RAY_CODES.clear()
+    _RAY_CODES[ray] = code
+    return code
+
 
 class Board:
     """Board class representing the game board."""
@@ -14,18 +53,26 @@ class Board:
 
     _size: int = 10
     _gameOver: bool = False
+    _end_reason: str = None
     _score: int = 0
     _snake: snake.Snake = None
     _food: list[Food] = []
+    _grid: OccupancyGrid = None
+    _rng = None
 
     # CONSTRUCTOR
 
-    def __init__(self, size=10):
+    def __init__(self, size=10, rng=None):
         """
         Initialize the board with a given size.
+        rng is the source of the placements and directions: a seed, a
+        NumPy Generator, a random.Random or an rng.BatchRandom (the
+        global random module by default, see rng.make_rng).
         """
+        self._rng = make_rng(rng)
         self.set_size(size)
         self.set_gameOver(False)
+        self._end_reason = None
         self.set_score(0)
         if self.set_snake() == 404:
             self.set_gameOver(True)
@@ -34,6 +81,7 @@ class Board:
 
     def reset(self):
         self.set_gameOver(False)
+        self._end_reason = None
         self.set_score(0)
         if self.set_snake() == 404:
             self.set_gameOver(True)
@@ -47,62 +95,64 @@ class Board:
         Set the size of the board.
         """
         self._size = size
+        self._grid = OccupancyGrid(size)
 
     def set_snake(self):
         """Set the snake object on the board."""
-        attempts = 0
-        random_direction = None
-        random_position = None
+        # The head is drawn directly inside the board, at least 3 cells
+        # away from the walls, so the body behind it always fits.
+        low, high = 3, self._size - 3
+        if low > high:
+            raise RuntimeError(
+                f"Unable to place snake. Board size={self._size}"
+            )
 
-        # When re-placing the snake (reset), avoid treating the old snake
-        # body as occupied. Only consider food positions as occupied.
-        occupied_for_placement = set()
-        if self._food:
-            for f in self._food:
-                occupied_for_placement.add(f.get_position())
+        # When re-placing the snake (reset), the old snake body is not
+        # occupied anymore. Only the food positions are.
+        self._grid.clear()
+        for f in self._food:
+            self._grid.add(f.get_position(), FOOD_FLAGS[f.get_color()])
 
-        while True:
-            try:
-                attempts += 1
-                random_direction = self.get_random_direction()
-                random_position = self.generate_random_position(
-                    occupied_positions=occupied_for_placement
-                )
-            except ValueError:
-                return 404
-
-            if (
-                random_position[0] > 2
-                and random_position[0] < self._size - 2
-                and random_position[1] > 2
-                and random_position[1] < self._size - 2
-            ):
+        random_direction = self.get_random_direction()
+        random_position = None
+        for _ in range(8):
+            position = (
+                self._rng.randint(low, high), self._rng.randint(low, high)
+            )
+            if not self._grid.at(position):
+                random_position = position
                 break
+        if random_position is None:
+            # Tiny inside area covered by food: pick among its free cells,
+            # or anywhere inside since set_food replaces the old food next
+            inside = [
+                (x, y)
+                for x in range(low, high + 1)
+                for y in range(low, high + 1)
+            ]
+            free = [p for p in inside if not self._grid.at(p)]
+            random_position = self._rng.choice(free or inside)
+
+        if DEBUG:
+            print(
+                "[DEBUG][set_snake]"
+                f" pos={random_position} size={self._size}"
+            )
 
-            if DEBUG and attempts % 50 == 0:
-                print(
-                    "[DEBUG][set_snake]"
-                    f" attempt={attempts} pos={random_position}"
-                    f" size={self._size}"
-                )
-
-            # Safety guard to avoid infinite loop on tiny boards
-            if attempts > 2000:
-                raise RuntimeError(
-                    f"Unable to place snake after {attempts} attempts."
-                    f" Board size={self._size}"
-                )
-
-        _snake = snake.Snake(random_position, random_direction)
+        _snake = snake.Snake(random_position, random_direction, self._grid)
         self._snake = _snake
 
     def set_food(self):
         """Set the food objects on the board."""
         food_list = []
+        # Each apple is marked at once, so the next one avoids its cell
         for color in ["RED", "GREEN", "GREEN"]:
             position = self.generate_random_position()
+            self._grid.add(position, FOOD_FLAGS[color])
             food_item = Food(position, color)
             food_list.append(food_item)
+        for f in self._food:
+            self._grid.remove(f.get_position(), FOOD)
         self._food = food_list
 
     def set_score(self, score: int):
@@ -137,6 +187,12 @@ class Board:
         """
         return self._food
 
+    def get_grid(self) -> OccupancyGrid:
+        """
+        Get the occupancy grid of the board.
+        """
+        return self._grid
+
     def get_score(self) -> int:
         """
         Get the current score of the game.
@@ -149,6 +205,14 @@ class Board:
         """
         return self._gameOver
 
+    def get_end_reason(self) -> str:
+        """
+        Get why the game ended: "wall", "body", "starved" (red apple
+        eaten with a single segment left), "full" (no free cell left for
+        an apple), or None while the game is running.
+        """
+        return self._end_reason
+
     # METHODS
 
     def get_occupied_positions(self) -> set:
@@ -157,8 +221,7 @@ class Board:
         """
         occupied_positions = set()
         if self._snake:
-            for segment in self._snake.get_body():
-                occupied_positions.add(segment)
+            occupied_positions.update(self._snake.get_cells())
         if self._food:
             for food_item in self._food:
                 occupied_positions.add(food_item.get_position())
@@ -168,16 +231,21 @@ class Board:
             self, occupied_positions: set = None) -> tuple:
         """
         Generate a random position on the board that is not occupied.
+        Without occupied_positions, the free-cell index of the grid is
+        used and the draw is O(1).
         """
         if occupied_positions is None:
-            occupied_positions = self.get_occupied_positions()
+            nb_free = self._grid.nb_free()
+            if not nb_free:
+                raise ValueError("No available positions on the board.")
+            return self._grid.get_free(self._rng.randrange(nb_free))
         if len(occupied_positions) >= self._size * self._size:
             raise ValueError("No available positions on the board.")
 
         while True:
             position = (
-                random.randint(0, self._size - 1),
-                random.randint(0, self._size - 1),
+                self._rng.randint(0, self._size - 1),
+                self._rng.randint(0, self._size - 1),
             )
             if position not in occupied_positions:
                 occupied_positions.add(position)
@@ -188,7 +256,7 @@ class Board:
         Get a random direction for the snake.
         """
         directions = ['UP', 'DOWN', 'LEFT', 'RIGHT']
-        return random.choice(directions)
+        return self._rng.choice(directions)
 
     def increase_score(self, points: int):
         """
@@ -206,6 +274,7 @@ class Board:
         """
         Remove the food item at the given position.
         """
+        self._grid.remove(position, FOOD)
         self._food = [
             f for f in self._food if f.get_position() != position
         ]
@@ -214,22 +283,17 @@ class Board:
         """
         Add a new food item at a random position.
         """
-        # Build the set of all board positions
-        all_positions = {
-            (x, y) for x in range(self._size) for y in range(self._size)
-        }
-        occupied = self.get_occupied_positions()
-
         # Free positions are those not occupied by snake or existing food
-        free_positions = list(all_positions - occupied)
-        if not free_positions:
+        nb_free = self._grid.nb_free()
+        if not nb_free:
             # No available cell to place new food
             return 404
 
         # Choose a random free cell
-        position = random.choice(free_positions)
+        position = self._grid.get_free(self._rng.randrange(nb_free))
         food_item = Food(position, color)
         self._food.append(food_item)
+        self._grid.add(position, FOOD_FLAGS[color])
         return position
 
     def is_valid_position(self, position: tuple) -> bool:
@@ -243,10 +307,14 @@ class Board:
         """
         Verify if the given position collides with the snake's body.
         """
-        if (not self.is_valid_position(position) or
-                position in self._snake.get_body()):
-            self._gameOver = True
-            return True
+        if not self.is_valid_position(position):
+            self._end_reason = "wall"
+        elif self._grid.at(position) & BODY:
+            self._end_reason = "body"
+        else:
+            return False
+        self._gameOver = True
+        return True
 
     def _symbol_at(self, position: tuple) -> str:
         """
@@ -255,17 +323,15 @@ class Board:
         if not self.is_valid_position(position):
             return "W"
 
-        head = self._snake.get_body()[0]
-        if position == head:
+        flags = self._grid.at(position)
+        if flags & HEAD:
             return "H"
-
-        if position in self._snake.get_body()[1:]:
+        if flags & BODY:
             return "S"
-
-        for food_item in self._food:
-            if food_item.get_position() == position:
-                return "G" if food_item.get_color() == "GREEN" else "R"
-
+        if flags & GREEN:
+            return "G"
+        if flags & RED:
+            return "R"
         return "0"
 
     @staticmethod
@@ -287,9 +353,10 @@ class Board:
             case _:
                 return 3
 
-    def display_vision(self):
+    def get_vision_symbols(self) -> dict[str, list[str]]:
         """
-        Affiche la vision du serpent de manière linéaire et lisible.
+        Return the symbols seen from the head in 4 directions, up to and
+        including the wall.
         """
         head_pos = self._snake.get_body()[0]
         directions = {
@@ -299,8 +366,7 @@ class Board:
             "RIGHT": (1, 0),
         }
 
-        print("\nVision (from Head):")
-
+        vision: dict[str, list[str]] = {}
         for name, (dx, dy) in directions.items():
             x, y = head_pos
             line_symbols = []
@@ -313,7 +379,15 @@ class Board:
                 line_symbols.append(symbol)
                 if symbol in ["W"]:
                     break
+            vision[name] = line_symbols
+        return vision
 
+    def display_vision(self):
+        """
+        Affiche la vision du serpent de manière linéaire et lisible.
+        """
+        print("\nVision (from Head):")
+        for name, line_symbols in self.get_vision_symbols().items():
             # Join symbols with spaces for readability
             print(f"{name:5} : {' '.join(line_symbols)}")
         print()
@@ -323,46 +397,42 @@ class Board:
         Return the snake vision in 4 directions from its head up to the wall.
         """
         head_x, head_y = self._snake.get_body()[0]
+        size = self._size
+        cells = self._grid.get_cells()
+        # (dx, dy, number of cells before the wall)
         directions = {
-            "UP": (0, -1),
-            "LEFT": (-1, 0),
-            "DOWN": (0, 1),
-            "RIGHT": (1, 0),
+            "UP": (0, -1, head_y),
+            "LEFT": (-1, 0, head_x),
+            "DOWN": (0, 1, size - 1 - head_y),
+            "RIGHT": (1, 0, size - 1 - head_x),
         }
 
         vision: dict[str, list[int]] = {}
-        for name, (dx, dy) in directions.items():
-            wall_distance: int = 0
+        for name, (dx, dy, ray_length) in directions.items():
+            wall_distance: int = ray_length + 1
             green_apple_distance: int = 0
             red_apple_distance: int = 0
-            steps: int = 0
 
-            x, y = head_x, head_y
-            max_steps = max(self._size * 3, 100)  # safety guard
+            index = head_y * size + head_x
+            offset = dy * size + dx
 
-            while True:
-                x += dx
-                y += dy
-                steps += 1
+            for steps in range(1, ray_length + 1):
+                index += offset
+                flags = cells[index]
 
                 if DEBUG:
-                    symbol = self._symbol_at((x, y)) if \
-                        self.is_valid_position((x, y)) else 'W'
-                    print(f"[DEBUG] dir={name} pos=({x},{y}) sym={symbol}")
+                    print(
+                        f"[DEBUG] dir={name}"
+                        f" pos=({head_x + steps * dx},{head_y + steps * dy})"
+                        f" flags={flags}"
+                    )
 
-                if steps > max_steps:
+                if flags & BODY:
                     wall_distance = steps
                     break
-
-                if not self.is_valid_position((x, y)) or \
-                   (x, y) in self._snake.get_body():
-                    wall_distance = steps
-                    break
-
-                symbol = self._symbol_at((x, y))
-                if symbol == "G" and green_apple_distance == 0:
+                if flags & GREEN and green_apple_distance == 0:
                     green_apple_distance = steps
-                if symbol == "R" and red_apple_distance == 0:
+                if flags & RED and red_apple_distance == 0:
                     red_apple_distance = steps
 
             vision[name] = [
@@ -373,6 +443,43 @@ class Board:
 
         return vision
 
+    def encode_state(self, as_tuple: bool = False):
+        """
+        Return get_state_tuple(get_snake_vision()) computed in one pass:
+        its base-4 integer (see q_table.encode_state), or the tuple itself
+        with as_tuple.
+        Each ray is sliced out of the grid, and its 3 buckets are looked
+        up by its cell flags (computed once per different ray).
+        """
+        head_x, head_y = self._snake.get_body()[0]
+        size = self._size
+        cells = self._grid.get_cells()
+        index = head_y * size + head_x
+        row = index - head_x
+
+        # UP, DOWN, LEFT, RIGHT, each ray from the head to the wall
+        rays = (
+            bytes(cells[index - size::-size]) if head_y else b"",
+            bytes(cells[index + size::size]),
+            bytes(cells[row:index])[::-1],
+            bytes(cells[index + 1:row + size]),
+        )
+        ray_codes = _RAY_CODES
+        codes = []
+        for ray in rays:
+            code = ray_codes.get(ray)
+            if code is None:
+                code = _ray_code(ray)
+            codes.append(code)
+
+        up, down, left, right = codes
+        if as_tuple:
+            return (
+                _RAY_DIGITS[up] + _RAY_DIGITS[down]
+                + _RAY_DIGITS[left] + _RAY_DIGITS[right]
+            )
+        return up << 18 | down << 12 | left << 6 | right
+
     def update(self):
         """
         Update the board state.
@@ -402,12 +509,14 @@ class Board:
                 self.remove_food_at_position(next_position)
                 if (self.add_food(food_item.get_color()) == 404):
                     self._gameOver = True
+                    self._end_reason = "full"
                     reward = 1000
                 break
         if self._snake.is_alive():
             self._snake.move(next_position)
         else:
             self._gameOver = True
+            self._end_reason = "starved"
 
         if reward == 0:
             reward = -1
@@ -0,0 +1,117 @@
+# checkpoint.py
+import os
+import threading
+import time
+
+from model_io import EXTENSION, save_model, write_pickle_model
+from q_table import arrays_to_dict
+
+
+def snapshot_q_table(agent):
+    """
+    Copy the agent's Q-table so it can be written while training goes on.
+    """
+    if agent.storage == "dict":
+        return {state: list(q) for state, q in agent.q_table.items()}
+    return agent.q_table.snapshot()
+
+
+def write_snapshot(filename: str, snapshot, dtype: str = "float32",
+                   meta: dict | None = None, visits: dict | None = None):
+    """
+    Write a snapshot atomically: to a temporary file, then renamed.
+    Binary models do not keep the visit counts.
+    """
+    if isinstance(snapshot, tuple):
+        snapshot = arrays_to_dict(*snapshot)
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if filename.endswith(EXTENSION):
+        save_model(filename, snapshot, dtype=dtype, meta=meta)
+    else:
+        write_pickle_model(filename, snapshot, meta, visits)
+
+
+class Checkpointer:
+    """
+    Save the Q-table every N sessions and/or every T seconds.
+    The table is copied in the training loop and written by a background
+    thread. A checkpoint due while the previous one is still being
+    written is skipped.
+    """
+
+    def __init__(self, path: str = "models/checkpoint.pkl",
+                 every_sessions: int = 0, every_seconds: float = 0.0):
+        """
+        path may contain {session}, replaced by the session number.
+        """
+        self.path = path
+        self.every_sessions = every_sessions
+        self.every_seconds = every_seconds
+        self.saved = 0
+        self.skipped = 0
+        self._last_time = time.monotonic()
+        self._thread: threading.Thread | None = None
+        self._error: BaseException | None = None
+
+    def maybe_save(self, agent, session: int):
+        """
+        Save a checkpoint if one is due. Call it after each session.
+        """
+        due = (
+            self.every_sessions > 0 and session % self.every_sessions == 0
+        ) or (
+            self.every_seconds > 0
+            and time.monotonic() - self._last_time >= self.every_seconds
+        )
+        if due:
+            self.save(agent, session)
+
+    def save(self, agent, session: int, wait: bool = False):
+        """
+        Snapshot the Q-table now and write it in the background
+        (or synchronously with wait).
+        """
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        if self._thread is not None and self._thread.is_alive():
+            if not wait:
+                self.skipped += 1
+                return
+            self._thread.join()
+
+        self._last_time = time.monotonic()
+        filename = self.path.format(session=session)
+        snapshot = snapshot_q_table(agent)
+        self._thread = threading.Thread(
+            target=self._write,
+            args=(
+                filename, snapshot, agent.dtype, agent.get_meta(),
+                agent.get_visits(),
+            ),
+            name="checkpoint", daemon=True,
+        )
+        self._thread.start()
+        if wait:
+            self.close()
+
+    def _write(self, filename: str, snapshot, dtype: str, meta: dict,
+               visits: dict):
+        try:
+            write_snapshot(filename, snapshot, dtype, meta, visits)
+            self.saved += 1
+        except BaseException as error:
+            self._error = error
+
+    def close(self):
+        """
+        Wait for the checkpoint being written, if any.
+        """
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
@@ -0,0 +1,315 @@
+# cli.py
+import argparse
+
+# Each command imports what it needs when it runs, so that headless
+# commands never load pygame or questionary.
+
+
+def _add_telemetry_arguments(parser):
+    parser.add_argument(
+        "--telemetry", choices=["off", "session", "step"], default=None,
+        help="what to report while playing",
+    )
+    parser.add_argument(
+        "--telemetry-every", type=int, default=1, metavar="N",
+        help="report one step out of N",
+    )
+    parser.add_argument(
+        "--telemetry-jsonl", default=None, metavar="FILE",
+        help="also write the reports to a JSON-lines file",
+    )
+
+
+def _make_telemetry(args):
+    if args.telemetry is None:
+        return None
+    from telemetry import Telemetry
+    return Telemetry(
+        level=args.telemetry, every=args.telemetry_every,
+        jsonl=args.telemetry_jsonl,
+    )
+
+
+def _add_record_arguments(parser):
+    parser.add_argument(
+        "--record", default=None, metavar="FILE",
+        help="record the games to an episode log (see recording.py)",
+    )
+    parser.add_argument(
+        "--record-causes", nargs="+", default=None,
+        choices=["wall", "body", "starved", "full"],
+        help="only record the games that ended this way",
+    )
+
+
+def _make_recorder(args):
+    if args.record is None:
+        return None
+    from recording import EpisodeRecorder
+    return EpisodeRecorder(args.record, causes=args.record_causes)
+
+
+def _make_agent(args):
+    """
+    Create the agent of the train command, resumed from a model if asked.
+    """
+    import os
+
+    from agent import Agent
+
+    replay = None
+    if args.replay:
+        from replay import ReplayBuffer
+        replay = ReplayBuffer(
+            args.replay, prioritized=args.prioritized, seed=args.seed
+        )
+    agent = Agent(
+        storage=args.storage, dtype=args.dtype, replay=replay,
+        batch_size=args.batch_size, replay_every=args.replay_every,
+        rule=args.rule, n_steps=args.n_steps, lam=args.lam,
+        symmetry=args.symmetry,
+    )
+    if args.resume:
+        if not os.path.exists(args.resume):
+            raise FileNotFoundError(f"{args.resume} not found.")
+        agent.load_q_table(args.resume)
+    if agent.sessions == 0:
+        agent.schedule_epsilon(args.sessions)
+    return agent
+
+
+def _train(args):
+    if args.workers > 1:
+        if (
+            args.live or args.replay or args.rule != "q" or args.resume
+            or args.record or args.symmetry
+        ):
+            raise SystemExit(
+                "--workers does not support --live, --replay, --rule,"
+                " --resume, --record or --symmetry."
+            )
+        from parallel import train_parallel
+        train_parallel(
+            args.size, args.sessions, workers=args.workers,
+            sync_every=args.sync_every, model_path=args.output,
+            save=not args.no_save, progress=not args.quiet, seed=args.seed,
+        )
+        return
+
+    agent = _make_agent(args)
+    profiler = None
+    if args.profile is not None:
+        from profiling import PhaseProfiler
+        profiler = PhaseProfiler(report_every=args.profile)
+    checkpointer = None
+    if args.checkpoint_every:
+        from checkpoint import Checkpointer
+        checkpointer = Checkpointer(
+            args.checkpoint, every_sessions=args.checkpoint_every
+        )
+
+    recorder = _make_recorder(args)
+    telemetry = _make_telemetry(args)
+    try:
+        if args.live:
+            from live import watch_training
+            watch_training(
+                args.size, args.cell_size, args.sessions, agent=agent,
+                profiler=profiler, checkpointer=checkpointer,
+                recorder=recorder, output=args.output,
+                save=not args.no_save, progress=not args.quiet,
+                seed=args.seed, telemetry=telemetry,
+            )
+        else:
+            from trainer import train
+            train(
+                args.size, args.sessions, agent=agent,
+                model_path=args.output, save=not args.no_save,
+                progress=not args.quiet, profiler=profiler,
+                checkpointer=checkpointer, telemetry=telemetry,
+                seed=args.seed, recorder=recorder,
+            )
+    finally:
+        if telemetry:
+            telemetry.close()
+        if recorder:
+            recorder.close()
+    if profiler:
+        print(profiler.report())
+
+
+def _play(args):
+    if args.model is None and not args.player:
+        raise SystemExit("play needs a model, or --player.")
+    from game import run_pygame
+
+    telemetry = _make_telemetry(args)
+    recorder = _make_recorder(args)
+    try:
+        run_pygame(
+            board_size=args.size, cell_size=args.cell_size,
+            game_tick_ms=args.tick, mode="player game" if args.player
+            else "game", model_path=args.model, telemetry=telemetry,
+            recorder=recorder,
+        )
+    finally:
+        if telemetry:
+            telemetry.close()
+        if recorder:
+            recorder.close()
+
+
+def _eval(rest):
+    from evaluate import main
+    main(rest, prog="main.py eval")
+
+
+def _convert(rest):
+    from model_io import main
+    main(rest, prog="main.py convert")
+
+
+def _sweep(rest):
+    from sweep import main
+    main(rest, prog="main.py sweep")
+
+
+def _prune(rest):
+    from prune import main
+    main(rest, prog="main.py prune")
+
+
+def _replay(rest):
+    from recording import main
+    main(rest, prog="main.py replay")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Learn2Slither. Without a command, the menu is shown.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train = commands.add_parser("train", help="train a model")
+    train.add_argument("--sessions", type=int, default=100)
+    train.add_argument("--size", type=int, default=10, help="board size")
+    train.add_argument(
+        "--resume", default=None, metavar="MODEL",
+        help="continue the training of a saved model",
+    )
+    train.add_argument(
+        "--output", default=None, metavar="MODEL",
+        help="where to save the model (models/q_table_<n>.pkl by default)",
+    )
+    train.add_argument("--no-save", action="store_true")
+    train.add_argument(
+        "--storage", choices=["dict", "dense", "sparse"], default="dict"
+    )
+    train.add_argument(
+        "--dtype", choices=["float32", "float16"], default="float32",
+        help="Q-values type of array storages",
+    )
+    train.add_argument(
+        "--rule", choices=["q", "nstep", "watkins"], default="q",
+        help="learning rule",
+    )
+    train.add_argument("--n-steps", type=int, default=3)
+    train.add_argument("--lam", type=float, default=0.3)
+    train.add_argument(
+        "--symmetry", action="store_true",
+        help="share one row between the rotations and reflections of a"
+        " state",
+    )
+    train.add_argument(
+        "--replay", type=int, default=0, metavar="CAPACITY",
+        help="learn from an experience replay buffer (array storages)",
+    )
+    train.add_argument("--prioritized", action="store_true")
+    train.add_argument("--batch-size", type=int, default=256)
+    train.add_argument("--replay-every", type=int, default=32)
+    train.add_argument("--seed", type=int, default=None)
+    train.add_argument(
+        "--workers", type=int, default=1,
+        help="train with several processes (see parallel.py)",
+    )
+    train.add_argument("--sync-every", type=int, default=100)
+    train.add_argument(
+        "--live", action="store_true",
+        help="watch the training at full speed in a window",
+    )
+    train.add_argument("--cell-size", type=int, default=32)
+    train.add_argument(
+        "--checkpoint-every", type=int, default=0, metavar="N",
+        help="save a checkpoint every N sessions",
+    )
+    train.add_argument("--checkpoint", default="models/checkpoint.pkl")
+    train.add_argument(
+        "--profile", type=float, default=None, metavar="SECONDS",
+        help="time the phases, report every SECONDS (0 = at the end)",
+    )
+    train.add_argument("--quiet", action="store_true", help="no progress")
+    _add_telemetry_arguments(train)
+    _add_record_arguments(train)
+
+    play = commands.add_parser("play", help="watch a model play")
+    play.add_argument("model", nargs="?", default=None)
+    play.add_argument(
+        "--player", action="store_true", help="play with the keyboard"
+    )
+    play.add_argument("--size", type=int, default=10, help="board size")
+    play.add_argument("--cell-size", type=int, default=32)
+    play.add_argument(
+        "--tick", type=int, default=125, help="milliseconds per move"
+    )
+    _add_telemetry_arguments(play)
+    _add_record_arguments(play)
+
+    commands.add_parser(
+        "eval", add_help=False,
+        help="evaluate models with greedy games (see evaluate.py)",
+    )
+    commands.add_parser(
+        "convert", add_help=False,
+        help="convert pickle models to the binary format (see model_io.py)",
+    )
+    commands.add_parser(
+        "sweep", add_help=False,
+        help="search hyperparameters across processes (see sweep.py)",
+    )
+    commands.add_parser(
+        "prune", add_help=False,
+        help="drop the unvisited states of saved models (see prune.py)",
+    )
+    commands.add_parser(
+        "replay", add_help=False,
+        help="list, check or watch recorded games (see recording.py)",
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if args.command == "eval":
+        _eval(rest)
+    elif args.command == "convert":
+        _convert(rest)
+    elif args.command == "sweep":
+        _sweep(rest)
+    elif args.command == "prune":
+        _prune(rest)
+    elif args.command == "replay":
+        _replay(rest)
+    else:
+        if rest:
+            parser.error(f"unrecognized arguments: {' '.join(rest)}")
+        if args.command == "train":
+            _train(args)
+        else:
+            _play(args)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,189 @@
+# evaluate.py
+import argparse
+import json
+import os
+import statistics
+import time
+from multiprocessing import Pool
+
+from agent import Agent
+from board import Board
+from trainer import DIRECTIONS
+
+# Agents already loaded by this worker process, by model path
+_AGENTS: dict[str, Agent] = {}
+
+
+def _load_agent(model_path: str) -> Agent:
+    agent = _AGENTS.get(model_path)
+    if agent is None:
+        agent = Agent()
+        agent.load_q_table(model_path, mmap=True)
+        agent.epsilon = 0.0
+        _AGENTS[model_path] = agent
+    return agent
+
+
+def play_greedy(agent: Agent, board_size: int = 10, seed: int = 0,
+                max_steps: int = 2000) -> dict:
+    """
+    Play one game without exploration nor learning.
+    A game still running after max_steps ends with cause "timeout".
+    """
+    game_board = Board(size=board_size, rng=seed)
+    max_length = len(game_board.get_snake().get_body())
+    steps = 0
+    as_tuple = agent.state_as_tuple()
+    while not game_board.is_gameOver() and steps < max_steps:
+        state = game_board.encode_state(as_tuple)
+        action = agent.choose_action(state)
+        game_board.get_snake().set_direction(DIRECTIONS[action])
+        game_board.update()
+        steps += 1
+        max_length = max(max_length, len(game_board.get_snake().get_body()))
+    return {
+        "score": game_board.get_score(),
+        "max_length": max_length,
+        "steps": steps,
+        "cause": game_board.get_end_reason() or "timeout",
+    }
+
+
+def _evaluate_worker(job):
+    model_path, board_size, seeds, max_steps = job
+    agent = _load_agent(model_path)
+    return model_path, [
+        play_greedy(agent, board_size, seed, max_steps) for seed in seeds
+    ]
+
+
+def _distribution(values: list) -> dict:
+    ordered = sorted(values)
+
+    def percentile(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "mean": statistics.fmean(ordered),
+        "std": statistics.pstdev(ordered),
+        "min": ordered[0],
+        "p10": percentile(0.10),
+        "p50": percentile(0.50),
+        "p90": percentile(0.90),
+        "max": ordered[-1],
+    }
+
+
+def summarize(games: list[dict], seconds: float) -> dict:
+    """
+    Aggregate the results of the games of one model.
+    """
+    causes: dict[str, int] = {}
+    for game in games:
+        causes[game["cause"]] = causes.get(game["cause"], 0) + 1
+    total_steps = sum(game["steps"] for game in games)
+    return {
+        "games": len(games),
+        "score": _distribution([game["score"] for game in games]),
+        "max_length": _distribution([game["max_length"] for game in games]),
+        "steps": _distribution([game["steps"] for game in games]),
+        "causes": causes,
+        "games_per_sec": len(games) / seconds if seconds else 0.0,
+        "steps_per_sec": total_steps / seconds if seconds else 0.0,
+    }
+
+
+def evaluate(model_paths: list[str], games: int = 100, board_size: int = 10,
+             workers: int | None = None, seed: int = 0,
+             max_steps: int = 2000) -> dict:
+    """
+    Play a number of greedy games with each model across a process pool.
+    Game i of every model uses seed + i, so results are reproducible and
+    models are compared on the same layouts.
+    """
+    if games < 1:
+        raise ValueError("games must be at least 1.")
+    # Checked before the pool starts: a model that cannot be loaded would
+    # be evaluated as an empty Q-table
+    for model_path in model_paths:
+        if not os.path.isfile(model_path):
+            raise FileNotFoundError(f"{model_path} not found.")
+        if not os.access(model_path, os.R_OK):
+            raise PermissionError(f"{model_path} cannot be read.")
+    workers = max(1, workers or os.cpu_count() or 1)
+    chunk = max(1, games // (workers * 4))
+    jobs = []
+    for model_path in model_paths:
+        for start in range(0, games, chunk):
+            seeds = range(seed + start, seed + min(games, start + chunk))
+            jobs.append((model_path, board_size, list(seeds), max_steps))
+
+    results: dict[str, list[dict]] = {path: [] for path in model_paths}
+    start_time = time.perf_counter()
+    with Pool(workers) as pool:
+        for model_path, played in pool.imap_unordered(
+                _evaluate_worker, jobs):
+            results[model_path].extend(played)
+    seconds = time.perf_counter() - start_time
+
+    # Throughput is shared between the models evaluated together
+    share = seconds / len(model_paths) if model_paths else 0.0
+    return {
+        path: summarize(played, share) for path, played in results.items()
+    }
+
+
+def format_report(report: dict) -> str:
+    """
+    Format the evaluation report as a table, best mean score first.
+    """
+    lines = [
+        f"{'model':32} {'games':>6} {'score':>8} {'p50':>6} {'max':>6}"
+        f" {'length':>7} {'steps':>8} {'games/s':>8}  causes"
+    ]
+    ranked = sorted(
+        report.items(), key=lambda item: -item[1]["score"]["mean"]
+    )
+    for path, summary in ranked:
+        causes = " ".join(
+            f"{cause}={count}"
+            for cause, count in sorted(summary["causes"].items())
+        )
+        lines.append(
+            f"{os.path.basename(path):32} {summary['games']:>6}"
+            f" {summary['score']['mean']:>8.1f}"
+            f" {summary['score']['p50']:>6} {summary['score']['max']:>6}"
+            f" {summary['max_length']['mean']:>7.1f}"
+            f" {summary['steps']['mean']:>8.1f}"
+            f" {summary['games_per_sec']:>8.1f}  {causes}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Evaluate saved models with greedy games."
+    )
+    parser.add_argument("models", nargs="+", help="models to evaluate")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--size", type=int, default=10, help="board size")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-steps", type=int, default=2000)
+    parser.add_argument("--json", default=None, help="write the report")
+    args = parser.parse_args(argv)
+    if args.games < 1:
+        parser.error("--games must be at least 1.")
+
+    report = evaluate(
+        args.models, games=args.games, board_size=args.size,
+        workers=args.workers, seed=args.seed, max_steps=args.max_steps,
+    )
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
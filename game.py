@@ -1,3 +1,4 @@
+import os
 import time
 
 # Pygame is optional; fallback to terminal mode if not installed
@@ -7,15 +8,11 @@ except ImportError:  # pragma: no cover - runtime fallback
     pygame = None
 
 from board import Board
-from render import ensure_screen, render
+from render import Renderer, ensure_screen
 from agent import Agent
-
-
-def get_state_tuple(vision_dict):
-    res = []
-    for direction in ["UP", "DOWN", "LEFT", "RIGHT"]:
-        res.extend(vision_dict[direction])
-    return tuple(res)
+from profiling import NULL_PROFILER
+from recording import RecordingBoard
+from telemetry import NULL_TELEMETRY, Telemetry
 
 
 def run_pygame(
@@ -26,7 +23,30 @@ def run_pygame(
     model_path: str | None = None,
     nb_sessions: int = 100,
     headless: bool = False,
+    storage: str = "dict",
+    profiler=None,
+    checkpointer=None,
+    threaded: bool = False,
+    telemetry=None,
+    recorder=None,
 ):
+    """
+    Run the game loop. profiler (a profiling.PhaseProfiler) times the
+    phases of each step: events, vision, action, update, learn, render.
+    checkpointer (a checkpoint.Checkpointer) saves the Q-table during
+    training.
+    threaded (train mode with display) trains at full speed in its own
+    thread and only draws the latest board at 60 fps, game_tick_ms is
+    ignored (see live.watch_training).
+    telemetry (a telemetry.Telemetry) reports the steps and sessions.
+    By default every step is reported in the human-readable format when
+    the game is displayed, and nothing is reported headless.
+    recorder (a recording.EpisodeRecorder) records the games played.
+    """
+    if profiler is None:
+        profiler = NULL_PROFILER
+    if telemetry is None:
+        telemetry = NULL_TELEMETRY if headless else Telemetry()
     try:
         from tqdm import tqdm
     except ImportError:
@@ -43,30 +63,48 @@ def run_pygame(
         )
         return
 
+    # A mistyped resume path would start from scratch and save the new
+    # model as if it had been resumed
+    if mode == "train" and model_path and not os.path.exists(model_path):
+        raise FileNotFoundError(f"{model_path} not found.")
+
+    if threaded and mode == "train" and not headless:
+        from live import watch_training
+        watch_training(
+            board_size, cell_size, nb_sessions, model_path=model_path,
+            storage=storage, profiler=profiler, checkpointer=checkpointer,
+            recorder=recorder,
+        )
+        return
+
     pygame.init()
-    game_board = Board(size=board_size)
-    game_agent = Agent()
+    if recorder is not None:
+        game_board = RecordingBoard(recorder, board_size)
+    else:
+        game_board = Board(size=board_size)
+    game_agent = Agent(storage=storage)
 
-    try:
-        epsilon_start = float(getattr(game_agent, "epsilon", 1.0))
-        epsilon_min = float(getattr(game_agent, "epsilon_min", 0.01))
-        if nb_sessions > 0 and epsilon_start > 0:
-            game_agent.epsilon_decay = (epsilon_min / epsilon_start) ** (
-                1.0 / nb_sessions
-            )
-    except Exception:
-        pass
+    # In train mode, model_path resumes the training of a saved model
+    if mode == "train" and model_path:
+        game_agent.load_q_table(model_path)
+    if game_agent.sessions == 0:
+        game_agent.schedule_epsilon(nb_sessions)
 
     if mode == "game" and model_path:
-        game_agent.load_q_table(model_path)
+        game_agent.load_q_table(model_path, mmap=True)
         game_agent.epsilon = 0.0
 
+    as_tuple = game_agent.state_as_tuple()
+
+    renderer = None
     if not headless:
-        screen = ensure_screen(board_size, cell_size)
+        # Only the cells that changed are redrawn, over a cached grid
+        renderer = Renderer(ensure_screen(board_size, cell_size), cell_size)
     clock = pygame.time.Clock()
     running = True
     first_render = True
     training_sessions = 0
+    games = 0
     training_enabled = mode != "game" and mode != "player game"
     best_score = 0
     step = 0
@@ -84,10 +122,13 @@ def run_pygame(
 
     while running:
         # --- Event handling ---
+        t = profiler.start()
         if mode == "player game":
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
+                if event.type == pygame.WINDOWEXPOSED and renderer:
+                    renderer.invalidate()
                 if event.type == pygame.KEYDOWN:
                     if event.key in (pygame.K_ESCAPE,):
                         running = False
@@ -99,11 +140,14 @@ def run_pygame(
                         game_board.get_snake().set_direction("LEFT")
                     elif event.key in (pygame.K_RIGHT, pygame.K_d):
                         game_board.get_snake().set_direction("RIGHT")
+            profiler.stop("events", t)
         else:
             advance_one_step = False
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
+                if event.type == pygame.WINDOWEXPOSED and renderer:
+                    renderer.invalidate()
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         running = False
@@ -118,18 +162,21 @@ def run_pygame(
                         step = 0
                         last_tick_time = pygame.time.get_ticks()
                         print("Game reset")
+            profiler.stop("events", t)
 
             # --- Pause handling ---
             if paused and not advance_one_step:
                 if not headless:
-                    render(game_board, screen, cell_size=cell_size)
+                    t = profiler.start()
+                    renderer.draw(game_board)
+                    profiler.stop("render", t)
                     clock.tick(60)
                 continue
 
         # --- First render splash ---
         if not headless:
             if first_render:
-                render(game_board, screen, cell_size=cell_size)
+                renderer.draw(game_board)
                 time.sleep(1.5)
                 first_render = False
                 last_tick_time = pygame.time.get_ticks()
@@ -141,49 +188,75 @@ def run_pygame(
         if effective_tick_ms > 0 and not advance_one_step:
             if now - last_tick_time < effective_tick_ms:
                 if not headless:
-                    render(game_board, screen, cell_size=cell_size)
+                    t = profiler.start()
+                    renderer.draw(game_board)
+                    profiler.stop("render", t)
                     clock.tick(60)
                 continue
         last_tick_time = now
 
         # --- Logic update ---
         step += 1
+        profiler.count("steps")
         if mode != "player game":
-            old_state = get_state_tuple(game_board.get_snake_vision())
+            t = profiler.start()
+            old_state = game_board.encode_state(as_tuple)
+            profiler.stop("vision", t)
+            t = profiler.start()
             action = game_agent.choose_action(old_state)
+            profiler.stop("action", t)
             directions = ["UP", "DOWN", "LEFT", "RIGHT"]
-            if not headless:
-                game_board.display_vision()
-                print(f"Action chosen: {directions[action]}")
-                print(f"Current score: {game_board.get_score()}")
-                print(f"Current step: {step}")
+            telemetry.step(game_board, step, directions[action])
             game_board.get_snake().set_direction(directions[action])
 
         if not game_board.is_gameOver():
+            t = profiler.start()
             reward = game_board.update()
+            profiler.stop("update", t)
             done = game_board.is_gameOver()
-            new_state = get_state_tuple(game_board.get_snake_vision())
+            t = profiler.start()
+            new_state = game_board.encode_state(as_tuple)
+            profiler.stop("vision", t)
             if training_enabled:
+                t = profiler.start()
                 game_agent.learn(old_state, action, reward, new_state, done)
+                profiler.stop("learn", t)
         else:
+            if profiler:
+                profiler.count("sessions")
+                profiler.set("q_table_states", len(game_agent.q_table))
+                profiler.periodic()
             if training_enabled:
                 training_sessions += 1
                 if pbar:
                     pbar.update(1)
+                if checkpointer:
+                    checkpointer.maybe_save(game_agent, training_sessions)
                 if training_sessions == nb_sessions:
-                    filename = f"models/q_table_{training_sessions}.pkl"
+                    filename = f"models/q_table_{game_agent.sessions}.pkl"
                     game_agent.save_q_table(filename)
                     running = False
             current_score = game_board.get_score()
+            # This tick only noticed the game over, it made no move
+            games += 1
+            telemetry.session(games, current_score, step - 1)
             if current_score > best_score:
                 best_score = current_score
             game_board.reset()
             step = 0
 
         if not headless:
-            render(game_board, screen, cell_size=cell_size)
+            t = profiler.start()
+            renderer.draw(game_board)
+            profiler.stop("render", t)
             clock.tick(60)
 
+    if checkpointer:
+        checkpointer.close()
+    telemetry.flush()
+    if recorder is not None:
+        game_board.finish()
+        recorder.flush()
     if pbar:
         pbar.close()
         print()
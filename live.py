@@ -0,0 +1,178 @@
+# live.py
+import threading
+from typing import NamedTuple
+
+import pygame
+
+from board import Board
+from recording import RecordingBoard
+from rng import streams
+from render import Renderer, ensure_screen
+from trainer import train
+
+
+class Snapshot(NamedTuple):
+    """
+    Immutable copy of what the render loop needs from a board.
+    """
+
+    size: int
+    cells: bytes
+    score: int
+    session: int
+    step: int
+
+
+class SnapshotChannel:
+    """
+    Hand the latest board snapshot from the simulation thread to the
+    render loop. A snapshot not drawn yet is replaced by the next one,
+    and the simulation only copies the board once the render loop has
+    taken the previous snapshot.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest: Snapshot | None = None
+        self._wanted = True
+        self.published = 0
+        self.taken = 0
+
+    def wanted(self) -> bool:
+        """
+        Check if the render loop is waiting for a new snapshot.
+        """
+        return self._wanted
+
+    def publish(self, snapshot: Snapshot):
+        with self._lock:
+            self._latest = snapshot
+            self._wanted = False
+            self.published += 1
+
+    def take(self) -> Snapshot | None:
+        """
+        Get the latest snapshot, or None if nothing new was published.
+        """
+        with self._lock:
+            snapshot, self._latest = self._latest, None
+            self._wanted = True
+        if snapshot is not None:
+            self.taken += 1
+        return snapshot
+
+
+class _Stopped(Exception):
+    """
+    Raised in the simulation thread when the window is closed.
+    """
+
+
+def watch_training(
+    board_size: int = 10,
+    cell_size: int = 32,
+    nb_sessions: int = 100,
+    model_path: str | None = None,
+    storage: str = "dict",
+    fps: int = 60,
+    agent=None,
+    profiler=None,
+    checkpointer=None,
+    recorder=None,
+    output: str | None = None,
+    save: bool = True,
+    progress: bool = True,
+    seed=None,
+    telemetry=None,
+):
+    """
+    Train in a background thread at full speed while the main thread
+    draws the latest board at fps frames per second. The states between
+    two frames are not drawn. model_path resumes the training of a saved
+    model. agent trains instead of a new one (see trainer.train).
+    Closing the window stops the training without saving it.
+    recorder (a recording.EpisodeRecorder) records the games played.
+    output, save, progress, seed and telemetry are passed to
+    trainer.train (output as its model_path).
+    """
+    board_rng = None
+    if seed is not None:
+        # Same board stream as a headless train with this seed
+        board_rng = streams(seed)[0]
+    if recorder is not None:
+        board = RecordingBoard(recorder, board_size, rng=board_rng)
+    else:
+        board = Board(size=board_size, rng=board_rng)
+    channel = SnapshotChannel()
+    stop = threading.Event()
+    session = [1]
+    errors: list[BaseException] = []
+
+    def on_step(step, reward):
+        if stop.is_set():
+            raise _Stopped()
+        if channel.wanted():
+            channel.publish(Snapshot(
+                board.get_size(), bytes(board.get_grid().get_cells()),
+                board.get_score(), session[0], step,
+            ))
+
+    def on_session(number, score):
+        session[0] = number + 1
+
+    def simulate():
+        try:
+            train(
+                board_size, nb_sessions, agent=agent, storage=storage,
+                resume_from=model_path, model_path=output, save=save,
+                progress=progress, on_step=on_step, on_session=on_session,
+                profiler=profiler, checkpointer=checkpointer, board=board,
+                telemetry=telemetry, seed=seed,
+            )
+        except _Stopped:
+            pass
+        except BaseException as error:
+            errors.append(error)
+
+    pygame.init()
+    renderer = Renderer(ensure_screen(board_size, cell_size), cell_size)
+    clock = pygame.time.Clock()
+    thread = threading.Thread(target=simulate, name="simulation")
+    thread.start()
+
+    running = True
+    caption = None
+    try:
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        running = False
+                if event.type == pygame.WINDOWEXPOSED:
+                    renderer.invalidate()
+
+            snapshot = channel.take()
+            if snapshot is not None:
+                renderer.draw_cells(snapshot.size, snapshot.cells)
+                number = min(snapshot.session, nb_sessions)
+                text = (
+                    f"Session {number}/{nb_sessions}"
+                    f" - Score {snapshot.score}"
+                )
+                if text != caption:
+                    caption = text
+                    pygame.display.set_caption(caption)
+            if not thread.is_alive():
+                running = False
+            clock.tick(fps)
+    finally:
+        stop.set()
+        thread.join()
+        if recorder is not None:
+            board.finish()
+            recorder.flush()
+    pygame.quit()
+    if errors:
+        raise errors[0]
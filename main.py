@@ -1,7 +1,12 @@
 import sys
 
-from menu import main_menu
 if __name__ == "__main__":
+    # With arguments, run a command without the menu (see cli.py)
+    if len(sys.argv) > 1:
+        from cli import main
+        sys.exit(main(sys.argv[1:]))
+
+    from menu import main_menu
     ret = main_menu()
     if ret == -1:
         sys.exit(0)
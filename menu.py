@@ -1,6 +1,7 @@
 import questionary
 import os
 from game import run_pygame
+from trainer import train
 
 
 SPEED_OPTIONS = {
@@ -17,18 +18,32 @@ def get_model_list():
     if not os.path.exists(models_dir):
         return []
 
-    model_files = [f for f in os.listdir(models_dir) if f.endswith(".pkl")]
+    model_files = [
+        f for f in os.listdir(models_dir) if f.endswith((".pkl", ".l2s"))
+    ]
     return model_files
 
 
-def ask_speed():
-    """Ask the user for a speed and return the corresponding game_tick_ms."""
+# Training only: simulation at full speed in its own thread
+LIVE_SPEED = "Live (full speed)"
+
+
+def ask_speed(live: bool = False):
+    """
+    Ask the user for a speed and return the corresponding game_tick_ms.
+    With live, the LIVE_SPEED choice is offered and returns 0.
+    """
+    choices = list(SPEED_OPTIONS.keys())
+    if live:
+        choices.append(LIVE_SPEED)
     speed_choice = questionary.select(
-        "Choose a speed:", choices=list(SPEED_OPTIONS.keys()) + ["← Back"]
+        "Choose a speed:", choices=choices + ["← Back"]
     ).ask()
 
     if speed_choice is None or speed_choice == "← Back":
         return None
+    if speed_choice == LIVE_SPEED:
+        return 0
 
     return SPEED_OPTIONS[speed_choice]
 
@@ -84,6 +99,15 @@ def training_mode_menu():
 
     nb_sessions = int(nb_sessions) if nb_sessions.strip() != "" else 100
 
+    model_choice = questionary.select(
+        "Start from:", choices=["New model"] + get_model_list() + ["← Back"]
+    ).ask()
+    if model_choice is None or model_choice == "← Back":
+        return
+    model_path = None
+    if model_choice != "New model":
+        model_path = os.path.join("models", model_choice)
+
     second_choice = questionary.confirm(
         "Do you want to run training with display enabled?"
     ).ask()
@@ -91,17 +115,20 @@ def training_mode_menu():
     if second_choice is None:
         return
 
-    game_tick_ms = 0
-    if second_choice:
-        game_tick_ms = ask_speed()
-        if game_tick_ms is None:
-            return
+    if not second_choice:
+        train(nb_sessions=nb_sessions, resume_from=model_path, progress=True)
+        return
+
+    game_tick_ms = ask_speed(live=True)
+    if game_tick_ms is None:
+        return
 
     run_pygame(
         mode="train",
         nb_sessions=nb_sessions,
         game_tick_ms=game_tick_ms,
-        headless=not second_choice,
+        model_path=model_path,
+        threaded=game_tick_ms == 0,
     )
 
 
@@ -0,0 +1,291 @@
+# model_io.py
+import argparse
+import json
+import os
+import pickle
+import struct
+
+import numpy as np
+
+from q_table import decode_state, encode_state
+
+# Binary model layout (little endian):
+#   header   magic, version, dtype code, nb_actions, nb_states, scale,
+#            metadata length
+#   metadata JSON object
+#   keys     uint32[nb_states], encoded states sorted in increasing order
+#   values   dtype[nb_states, nb_actions], aligned on 64 bytes
+MAGIC = b"L2SQ"
+VERSION = 1
+EXTENSION = ".l2s"
+_HEADER = struct.Struct("<4sHBBQdI")
+_ALIGN = 64
+
+DTYPES = {
+    "float32": (0, np.float32),
+    "float16": (1, np.float16),
+    "int8": (2, np.int8),
+    "float64": (3, np.float64),
+}
+_CODES = {code: name for name, (code, _) in DTYPES.items()}
+
+# Pickle models are {"format": PICKLE_FORMAT, "meta": {...},
+# "q_table": {...}, "visits": {...}}, visits counting the updates of each
+# state (absent from older models). The oldest ones are the bare Q-table
+# dict.
+PICKLE_FORMAT = "learn2slither-model"
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def is_binary_model(filename: str) -> bool:
+    """
+    Check if a file is a binary model (and not a pickle).
+    """
+    try:
+        with open(filename, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def read_pickle_data(filename: str) -> tuple[dict, dict, dict]:
+    """
+    Read a pickle model. Return the Q-table, its metadata and its visit
+    counts (empty for the models saved without them).
+    """
+    with open(filename, "rb") as f:
+        data = pickle.load(f)
+    if isinstance(data, dict) and data.get("format") == PICKLE_FORMAT:
+        return data["q_table"], data.get("meta", {}), data.get("visits", {})
+    return data, {}, {}
+
+
+def read_pickle_model(filename: str) -> tuple[dict, dict]:
+    """
+    Read a pickle model. Return the Q-table and its metadata
+    (empty for the models saved without metadata).
+    """
+    q_table, meta, _ = read_pickle_data(filename)
+    return q_table, meta
+
+
+def write_pickle_model(filename: str, q_table: dict,
+                       meta: dict | None = None,
+                       visits: dict | None = None):
+    """
+    Write a pickle model with its metadata and visit counts, to a
+    temporary file then renamed.
+    """
+    data = {"format": PICKLE_FORMAT, "meta": meta or {}, "q_table": q_table}
+    if visits is not None:
+        data["visits"] = visits
+    tmp = f"{filename}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(data, f)
+    os.replace(tmp, filename)
+
+
+def read_model(filename: str) -> tuple[dict, dict]:
+    """
+    Read a pickle or binary model into a dict Q-table and its metadata.
+    """
+    if is_binary_model(filename):
+        mapped = MappedQTable(filename, mmap=False)
+        return mapped.to_dict(), mapped.meta
+    return read_pickle_model(filename)
+
+
+def save_model(filename: str, q_table: dict, dtype: str = "float32",
+               meta: dict | None = None, nb_actions: int = 4):
+    """
+    Save a dict Q-table (state tuple -> Q-values) in the binary format.
+    float16 and int8 quantize the Q-values (int8 with one global scale).
+    The file is written to a temporary name then renamed.
+    """
+    if dtype not in DTYPES:
+        raise ValueError(
+            f"Invalid dtype '{dtype}'. Use {', '.join(DTYPES)}."
+        )
+    code, np_dtype = DTYPES[dtype]
+
+    keys = np.fromiter(
+        (encode_state(state) for state in q_table),
+        dtype=np.uint32, count=len(q_table),
+    )
+    values = np.array(list(q_table.values()), dtype=np.float64)
+    values = values.reshape(len(q_table), nb_actions)
+    order = np.argsort(keys)
+    keys = keys[order]
+    values = values[order]
+
+    scale = 1.0
+    if dtype == "int8":
+        peak = float(np.abs(values).max()) if values.size else 0.0
+        scale = peak / 127.0 if peak > 0 else 1.0
+        values = np.rint(values / scale)
+    values = values.astype(np_dtype)
+
+    meta_bytes = json.dumps(meta or {}).encode()
+    header = _HEADER.pack(
+        MAGIC, VERSION, code, nb_actions, len(keys), scale, len(meta_bytes)
+    )
+    keys_offset = _align(_HEADER.size + len(meta_bytes))
+    values_offset = _align(keys_offset + keys.nbytes)
+
+    tmp = f"{filename}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(meta_bytes)
+        f.write(b"\0" * (keys_offset - f.tell()))
+        f.write(keys.astype("<u4").tobytes())
+        f.write(b"\0" * (values_offset - f.tell()))
+        f.write(values.astype(values.dtype.newbyteorder("<")).tobytes())
+    os.replace(tmp, filename)
+
+
+class MappedQTable:
+    """
+    Read-only Q-table backed by a binary model file. With mmap the file
+    is not read at load time, and processes share the same pages.
+    """
+
+    def __init__(self, filename: str, mmap: bool = True):
+        with open(filename, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError(f"{filename} is not a binary model.")
+            (magic, version, code, nb_actions, nb_states, scale,
+             meta_length) = _HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f"{filename} is not a binary model.")
+            if version > VERSION:
+                raise ValueError(
+                    f"{filename} has version {version},"
+                    f" only {VERSION} is supported."
+                )
+            self.meta = json.loads(f.read(meta_length) or b"{}")
+
+        self.dtype = _CODES[code]
+        self._scale = scale
+        np_dtype = np.dtype(DTYPES[self.dtype][1]).newbyteorder("<")
+        keys_offset = _align(_HEADER.size + meta_length)
+        values_offset = _align(keys_offset + 4 * nb_states)
+
+        if nb_states == 0:
+            self._keys = np.zeros(0, dtype="<u4")
+            self._values = np.zeros((0, nb_actions), dtype=np_dtype)
+        elif mmap:
+            self._keys = np.memmap(
+                filename, dtype="<u4", mode="r",
+                offset=keys_offset, shape=(nb_states,),
+            )
+            self._values = np.memmap(
+                filename, dtype=np_dtype, mode="r",
+                offset=values_offset, shape=(nb_states, nb_actions),
+            )
+        else:
+            with open(filename, "rb") as f:
+                data = f.read()
+            self._keys = np.frombuffer(
+                data, dtype="<u4", count=nb_states, offset=keys_offset
+            )
+            self._values = np.frombuffer(
+                data, dtype=np_dtype, count=nb_states * nb_actions,
+                offset=values_offset,
+            ).reshape(nb_states, nb_actions)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _row(self, state):
+        """
+        Get the row of a state (tuple or encoded integer), or None.
+        """
+        if not isinstance(state, (int, np.integer)):
+            state = encode_state(state)
+        row = int(np.searchsorted(self._keys, state))
+        if row < len(self._keys) and self._keys[row] == state:
+            return row
+        return None
+
+    def _dequantize(self, values: np.ndarray) -> np.ndarray:
+        if self.dtype == "int8":
+            return values.astype(np.float32) * self._scale
+        return values.astype(np.float32)
+
+    def __contains__(self, state) -> bool:
+        return self._row(state) is not None
+
+    def __getitem__(self, state) -> np.ndarray:
+        row = self._row(state)
+        if row is None:
+            raise KeyError(state)
+        return self._dequantize(self._values[row])
+
+    def get(self, state, default=None):
+        """
+        Get the Q-values of a state, or default if not present.
+        """
+        row = self._row(state)
+        if row is None:
+            return default
+        return self._dequantize(self._values[row])
+
+    def keys(self):
+        """
+        Get the states present in the table, as tuples.
+        """
+        return [decode_state(index) for index in self._keys]
+
+    def to_dict(self) -> dict[tuple[int, ...], list[float]]:
+        """
+        Export the table in the dict format used by the pickle models.
+        """
+        values = self._dequantize(np.asarray(self._values)).tolist()
+        return {
+            decode_state(index): row
+            for index, row in zip(self._keys.tolist(), values)
+        }
+
+
+def load_model(filename: str, mmap: bool = True) -> MappedQTable:
+    """
+    Load a binary model as a read-only Q-table.
+    """
+    return MappedQTable(filename, mmap=mmap)
+
+
+def convert(filename: str, output: str | None = None,
+            dtype: str = "float32") -> str:
+    """
+    Convert a pickle model into the binary format.
+    Return the path of the written file.
+    """
+    if output is None:
+        output = os.path.splitext(filename)[0] + EXTENSION
+    q_table, meta = read_pickle_model(filename)
+    save_model(output, q_table, dtype=dtype, meta=meta)
+    return output
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Convert pickle models into the binary model format.",
+    )
+    parser.add_argument("models", nargs="+", help="pickle models to convert")
+    parser.add_argument(
+        "--dtype", choices=list(DTYPES), default="float32",
+        help="storage type of the Q-values (default float32)",
+    )
+    args = parser.parse_args(argv)
+    for filename in args.models:
+        output = convert(filename, dtype=args.dtype)
+        print(f"{filename} -> {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# occupancy.py
+
+# Cell flags. A cell can hold several of them at once: an apple can spawn
+# on the cell the head is about to enter (see Board.update).
+EMPTY = 0
+BODY = 1
+HEAD = 2
+GREEN = 4
+RED = 8
+FOOD = GREEN | RED
+
+FOOD_FLAGS = {"GREEN": GREEN, "RED": RED}
+
+
+class OccupancyGrid:
+    """
+    Per-cell flags of the board, kept up to date by the snake and the
+    food operations so that lookups never scan the body or the food list.
+    Also keeps an index of the empty cells (swap-remove list plus
+    cell -> slot map) so a random free cell is found in O(1).
+    """
+
+    # ATTRIBUTES
+
+    _size: int
+    _cells: bytearray
+    _free: list[int]
+    _slots: list[int]
+
+    # CONSTRUCTOR
+
+    def __init__(self, size: int):
+        """
+        Initialize an empty grid of size x size cells.
+        """
+        self._size = size
+        self._cells = bytearray(size * size)
+        self._free = list(range(size * size))
+        self._slots = list(range(size * size))
+
+    # GETTERS
+
+    def get_size(self) -> int:
+        """
+        Get the size of the grid.
+        """
+        return self._size
+
+    def get_cells(self) -> bytearray:
+        """
+        Get the flags of every cell, row by row.
+        """
+        return self._cells
+
+    def at(self, position: tuple) -> int:
+        """
+        Get the flags at a position inside the board.
+        """
+        return self._cells[position[1] * self._size + position[0]]
+
+    def nb_free(self) -> int:
+        """
+        Get the number of empty cells.
+        """
+        return len(self._free)
+
+    def get_free(self, slot: int) -> tuple:
+        """
+        Get the position of the empty cell stored at a slot of the index,
+        0 <= slot < nb_free(). A random slot gives a uniform free cell.
+        """
+        y, x = divmod(self._free[slot], self._size)
+        return (x, y)
+
+    # METHODS
+
+    def add(self, position: tuple, flags: int):
+        """
+        Set flags at a position.
+        """
+        index = position[1] * self._size + position[0]
+        if not self._cells[index] and flags:
+            self._take(index)
+        self._cells[index] |= flags
+
+    def remove(self, position: tuple, flags: int):
+        """
+        Clear flags at a position.
+        """
+        index = position[1] * self._size + position[0]
+        if self._cells[index] and not self._cells[index] & ~flags:
+            self._release(index)
+        self._cells[index] &= ~flags & 0xFF
+
+    def clear(self):
+        """
+        Empty every cell.
+        """
+        self._cells[:] = bytes(len(self._cells))
+        self._free = list(range(len(self._cells)))
+        self._slots = list(range(len(self._cells)))
+
+    def _take(self, index: int):
+        """
+        Remove a cell from the free index (swap with the last one).
+        """
+        slot = self._slots[index]
+        last = self._free.pop()
+        if last != index:
+            self._free[slot] = last
+            self._slots[last] = slot
+        self._slots[index] = -1
+
+    def _release(self, index: int):
+        """
+        Add a cell back to the free index.
+        """
+        self._slots[index] = len(self._free)
+        self._free.append(index)
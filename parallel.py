@@ -0,0 +1,146 @@
+# parallel.py
+import os
+from multiprocessing import Pool
+
+from agent import Agent
+from trainer import train
+
+
+def _train_worker(job):
+    """
+    Train a copy of the shared Q-table for a few sessions.
+    Return the changed rows as deltas, their visit counts and the
+    worker's epsilon.
+    """
+    q_table, epsilon, epsilon_decay, nb_sessions, board_size, seed = job
+    agent = Agent()
+    agent.q_table = {state: list(q) for state, q in q_table.items()}
+    agent.epsilon = epsilon
+    agent.epsilon_decay = epsilon_decay
+    train(board_size, nb_sessions, agent=agent, save=False, seed=seed)
+
+    deltas = {}
+    for state, q_values in agent.q_table.items():
+        base = q_table.get(state)
+        if base is None:
+            deltas[state] = list(q_values)
+        elif state in agent.visits:
+            deltas[state] = [new - old for new, old in zip(q_values, base)]
+    return deltas, agent.visits, agent.epsilon
+
+
+def merge_q_tables(q_table: dict, results: list) -> dict:
+    """
+    Apply the workers' deltas to the Q-table. Each row moves by the
+    average of the deltas, weighted by how often each worker visited it.
+    """
+    sums: dict[tuple[int, ...], list[float]] = {}
+    weights: dict[tuple[int, ...], int] = {}
+    for deltas, visits, _ in results:
+        for state, delta in deltas.items():
+            weight = visits.get(state, 0)
+            if state not in sums:
+                sums[state] = [0.0 for _ in delta]
+                weights[state] = 0
+            if weight:
+                row = sums[state]
+                for action, value in enumerate(delta):
+                    row[action] += weight * value
+                weights[state] += weight
+
+    merged = dict(q_table)
+    for state, row in sums.items():
+        base = merged.get(state, [0.0 for _ in row])
+        weight = weights[state]
+        if weight:
+            merged[state] = [
+                old + value / weight for old, value in zip(base, row)
+            ]
+        else:
+            merged[state] = list(base)
+    return merged
+
+
+def train_parallel(
+    board_size: int = 10,
+    nb_sessions: int = 100,
+    workers: int | None = None,
+    sync_every: int = 100,
+    model_path: str | None = None,
+    save: bool = True,
+    progress: bool = False,
+    seed: int | None = None,
+) -> Agent:
+    """
+    Train with several processes. The sessions are split across workers,
+    each with its own board, agent and epsilon schedule. Every sync_every
+    sessions the Q-tables are merged and sent back to all workers.
+    The merged Q-table is saved to model_path
+    (models/q_table_<n>.pkl by default).
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, nb_sessions))
+    shares = [
+        nb_sessions // workers + (i < nb_sessions % workers)
+        for i in range(workers)
+    ]
+
+    agent = Agent()
+    epsilons = []
+    decays = []
+    for share in shares:
+        worker_agent = Agent()
+        worker_agent.schedule_epsilon(share)
+        epsilons.append(worker_agent.epsilon)
+        decays.append(worker_agent.epsilon_decay)
+    done = [0 for _ in shares]
+
+    pbar = None
+    if progress:
+        try:
+            from tqdm import tqdm
+            pbar = tqdm(total=nb_sessions, desc="Training", unit="session")
+        except ImportError:
+            print(
+                "tqdm is not installed. "
+                "Progress bar will be disabled during training."
+            )
+
+    sync = 0
+    with Pool(workers) as pool:
+        while any(d < s for d, s in zip(done, shares)):
+            jobs = []
+            ids = []
+            for i, share in enumerate(shares):
+                count = min(sync_every, share - done[i])
+                if count <= 0:
+                    continue
+                worker_seed = None if seed is None else (seed, i, sync)
+                jobs.append((
+                    agent.q_table, epsilons[i], decays[i],
+                    count, board_size, worker_seed,
+                ))
+                ids.append((i, count))
+
+            results = pool.map(_train_worker, jobs)
+            agent.q_table = merge_q_tables(agent.q_table, results)
+
+            for (i, count), (_, visits, epsilon) in zip(ids, results):
+                for state, visit_count in visits.items():
+                    agent.visits[state] = (
+                        agent.visits.get(state, 0) + visit_count
+                    )
+                epsilons[i] = epsilon
+                done[i] += count
+                if pbar:
+                    pbar.update(count)
+            sync += 1
+
+    agent.epsilon = min(epsilons)
+    agent.sessions = nb_sessions
+    if save:
+        if model_path is None:
+            model_path = f"models/q_table_{nb_sessions}.pkl"
+        agent.save_q_table(model_path)
+    if pbar:
+        pbar.close()
+    return agent
@@ -0,0 +1,164 @@
+# profiling.py
+import json
+import time
+from time import perf_counter_ns
+
+# Histogram bucket k holds durations d with 2**(k-1) <= d < 2**k ns
+_NB_BUCKETS = 48
+
+
+class PhaseProfiler:
+    """
+    Timers and counters for the phases of the game loop.
+    Durations are aggregated in log2 histograms, so memory stays constant
+    whatever the length of the run.
+    """
+
+    def __init__(self, report_every: float = 0.0):
+        """
+        report_every: seconds between two periodic reports (0 = never).
+        """
+        self._phases: dict[str, list] = {}
+        self._counters: dict[str, int] = {}
+        self._report_every = report_every
+        self._last_report = time.monotonic()
+
+    def __bool__(self) -> bool:
+        return True
+
+    def start(self) -> int:
+        """
+        Return the start time of a phase, to give back to stop.
+        """
+        return perf_counter_ns()
+
+    def stop(self, phase: str, start: int):
+        """
+        Record the duration of a phase started at start.
+        """
+        elapsed = perf_counter_ns() - start
+        stats = self._phases.get(phase)
+        if stats is None:
+            # count, total, min, max, histogram
+            stats = [0, 0, elapsed, elapsed, [0] * _NB_BUCKETS]
+            self._phases[phase] = stats
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed < stats[2]:
+            stats[2] = elapsed
+        if elapsed > stats[3]:
+            stats[3] = elapsed
+        stats[4][min(elapsed.bit_length(), _NB_BUCKETS - 1)] += 1
+
+    def count(self, name: str, value: int = 1):
+        """
+        Increase a counter.
+        """
+        self._counters[name] = self._counters.get(name, 0) + value
+
+    def set(self, name: str, value: int):
+        """
+        Set a counter to a value (for example the Q-table size).
+        """
+        self._counters[name] = value
+
+    def periodic(self):
+        """
+        Print the summary if report_every seconds have passed.
+        """
+        if self._report_every <= 0:
+            return
+        now = time.monotonic()
+        if now - self._last_report >= self._report_every:
+            self._last_report = now
+            print(self.report())
+
+    def summary(self) -> dict:
+        """
+        Return the aggregated phases and counters.
+        """
+        phases = {}
+        for phase, (count, total, low, high, buckets) in \
+                self._phases.items():
+            phases[phase] = {
+                "count": count,
+                "total_ms": total / 1e6,
+                "mean_us": total / count / 1e3,
+                "min_us": low / 1e3,
+                "max_us": high / 1e3,
+                "p50_us": _percentile(buckets, count, 0.50) / 1e3,
+                "p90_us": _percentile(buckets, count, 0.90) / 1e3,
+                "p99_us": _percentile(buckets, count, 0.99) / 1e3,
+                "histogram": {
+                    f"<{2 ** k}ns": n for k, n in enumerate(buckets) if n
+                },
+            }
+        return {"phases": phases, "counters": dict(self._counters)}
+
+    def report(self) -> str:
+        """
+        Return the summary as a human-readable table.
+        """
+        summary = self.summary()
+        total = sum(p["total_ms"] for p in summary["phases"].values()) or 1
+        lines = [
+            f"{'phase':10} {'count':>10} {'total ms':>10} {'share':>6}"
+            f" {'mean us':>9} {'p50 us':>9} {'p99 us':>9}"
+        ]
+        for phase, p in summary["phases"].items():
+            lines.append(
+                f"{phase:10} {p['count']:>10} {p['total_ms']:>10.1f}"
+                f" {100 * p['total_ms'] / total:>5.1f}%"
+                f" {p['mean_us']:>9.2f} {p['p50_us']:>9.2f}"
+                f" {p['p99_us']:>9.2f}"
+            )
+        for name, value in summary["counters"].items():
+            lines.append(f"{name}: {value}")
+        return "\n".join(lines)
+
+    def to_json(self, filename: str):
+        """
+        Write the summary to a JSON file.
+        """
+        with open(filename, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+def _percentile(buckets: list[int], count: int, q: float) -> float:
+    """
+    Upper bound of the bucket holding the q-th duration.
+    """
+    rank = q * count
+    seen = 0
+    for k, n in enumerate(buckets):
+        seen += n
+        if seen >= rank:
+            return float(2 ** k)
+    return float(2 ** (len(buckets) - 1))
+
+
+class NullProfiler:
+    """
+    Profiler that records nothing, used when profiling is disabled.
+    """
+
+    def __bool__(self) -> bool:
+        return False
+
+    def start(self) -> int:
+        return 0
+
+    def stop(self, phase: str, start: int):
+        pass
+
+    def count(self, name: str, value: int = 1):
+        pass
+
+    def set(self, name: str, value: int):
+        pass
+
+    def periodic(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,122 @@
+# prune.py
+import argparse
+import os
+
+from model_io import (
+    MappedQTable, is_binary_model, read_pickle_data, save_model,
+    write_pickle_model,
+)
+
+
+def prune_q_table(q_table: dict, visits: dict | None = None,
+                  min_visits: int = 1) -> tuple[dict, dict]:
+    """
+    Drop the rows of a dict Q-table that are all zeros: an unknown state
+    gets the same zeros, so nothing changes when playing or training.
+    With visit counts, also drop the states updated fewer than min_visits
+    times. Return the kept rows and their visit counts.
+    """
+    kept = {}
+    for state, q_values in q_table.items():
+        if visits and visits.get(state, 0) < min_visits:
+            continue
+        if not any(q_values):
+            continue
+        kept[state] = q_values
+    kept_visits = {
+        state: count for state, count in (visits or {}).items()
+        if state in kept
+    }
+    return kept, kept_visits
+
+
+def prune_model(filename: str, output: str | None = None,
+                min_visits: int = 1, dry_run: bool = False) -> dict:
+    """
+    Prune a pickle or binary model (see prune_q_table) and write it in the
+    same format, to output or over the model itself.
+    Binary models have no visit counts, only their zero rows are dropped.
+    Return the number of states and the file size before and after.
+    """
+    if output is None:
+        output = filename
+    binary = is_binary_model(filename)
+    if binary:
+        mapped = MappedQTable(filename, mmap=False)
+        q_table, meta, visits = mapped.to_dict(), mapped.meta, {}
+    else:
+        q_table, meta, visits = read_pickle_data(filename)
+    kept, kept_visits = prune_q_table(q_table, visits, min_visits)
+
+    report = {
+        "model": filename,
+        "output": None if dry_run else output,
+        "visits": bool(visits),
+        "states": len(q_table),
+        "kept": len(kept),
+        "bytes": os.path.getsize(filename),
+        "kept_bytes": None,
+    }
+    if dry_run:
+        return report
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if binary:
+        save_model(output, kept, dtype=mapped.dtype, meta=meta)
+    else:
+        write_pickle_model(output, kept, meta, kept_visits)
+    report["kept_bytes"] = os.path.getsize(output)
+    return report
+
+
+def format_report(report: dict) -> str:
+    dropped = report["states"] - report["kept"]
+    share = dropped / report["states"] if report["states"] else 0.0
+    line = (
+        f"{report['model']}: {report['states']} -> {report['kept']} states"
+        f" ({share:.0%} dropped"
+        f"{'' if report['visits'] else ', zero rows only: no visit counts'})"
+    )
+    if report["kept_bytes"] is not None:
+        line += (
+            f", {report['bytes'] / 1e6:.2f} MB ->"
+            f" {report['kept_bytes'] / 1e6:.2f} MB"
+        )
+        if report["output"] != report["model"]:
+            line += f" in {report['output']}"
+    return line
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Drop the unvisited or rarely visited states of saved"
+        " models.",
+    )
+    parser.add_argument("models", nargs="+", help="models to prune")
+    parser.add_argument(
+        "--min-visits", type=int, default=1, metavar="N",
+        help="drop the states updated fewer than N times (default 1)",
+    )
+    parser.add_argument(
+        "--output", default=None, metavar="MODEL",
+        help="write the pruned model there (one model only), instead of"
+        " over the model",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only report, write nothing"
+    )
+    args = parser.parse_args(argv)
+    if args.output and len(args.models) > 1:
+        parser.error("--output needs a single model.")
+
+    for filename in args.models:
+        report = prune_model(
+            filename, args.output, args.min_visits, args.dry_run
+        )
+        print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
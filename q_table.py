@@ -0,0 +1,202 @@
+# q_table.py
+import numpy as np
+
+# Each of the 12 vision features is a bucket between 0 and 3, so a state
+# is a 12 digits number in base 4.
+NB_FEATURES = 12
+NB_VALUES = 4
+NB_STATES = NB_VALUES ** NB_FEATURES
+
+_POWERS = NB_VALUES ** np.arange(NB_FEATURES - 1, -1, -1, dtype=np.int64)
+
+
+def encode_state(state) -> int:
+    """
+    Encode a 12-tuple state into its base-4 integer index.
+    """
+    index = 0
+    for value in state:
+        index = index * NB_VALUES + int(value)
+    return index
+
+
+def decode_state(index: int) -> tuple[int, ...]:
+    """
+    Decode a base-4 integer index back into the 12-tuple state.
+    """
+    digits = []
+    for _ in range(NB_FEATURES):
+        index, value = divmod(int(index), NB_VALUES)
+        digits.append(value)
+    return tuple(reversed(digits))
+
+
+def encode_states(states) -> np.ndarray:
+    """
+    Encode a (N, 12) batch of states into N integer indexes.
+    """
+    return np.asarray(states, dtype=np.int64) @ _POWERS
+
+
+def arrays_to_dict(keys, values) -> dict[tuple[int, ...], list[float]]:
+    """
+    Build a dict Q-table from encoded states and their rows.
+    """
+    return {
+        decode_state(index): row
+        for index, row in zip(keys.tolist(), values.tolist())
+    }
+
+
+class DenseQTable:
+    """
+    Q-table stored in one preallocated array indexed by the encoded state.
+    The array is allocated with np.zeros, so the OS only backs the pages
+    that are actually written.
+    """
+
+    def __init__(self, nb_actions: int = 4, dtype="float32"):
+        self.values = np.zeros((NB_STATES, nb_actions), dtype=dtype)
+        self._present = np.zeros(NB_STATES, dtype=bool)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._present))
+
+    def __contains__(self, index: int) -> bool:
+        return bool(self._present[index])
+
+    def slot(self, index: int) -> int:
+        """
+        Get the row of a state, registering it if not present.
+        """
+        self._present[index] = True
+        return index
+
+    def slots(self, indexes: np.ndarray) -> np.ndarray:
+        """
+        Same as slot, for an array of encoded states.
+        """
+        self._present[indexes] = True
+        return indexes
+
+    def get(self, index: int):
+        """
+        Get the row of a state, or None if not present.
+        """
+        return index if self._present[index] else None
+
+    def keys(self) -> np.ndarray:
+        """
+        Get the encoded states present in the table.
+        """
+        return np.flatnonzero(self._present)
+
+    def to_dict(self) -> dict[tuple[int, ...], list[float]]:
+        """
+        Export the table in the dict format used by the pickle models.
+        """
+        return {
+            decode_state(index): self.values[index].tolist()
+            for index in self.keys()
+        }
+
+    def snapshot(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Copy the present states and their rows (see arrays_to_dict).
+        """
+        keys = self.keys()
+        return keys, self.values[keys]
+
+    def update(self, q_table: dict):
+        """
+        Import the rows of a dict Q-table.
+        """
+        for state, q_values in q_table.items():
+            self.values[self.slot(encode_state(state))] = q_values
+
+
+class SparseQTable:
+    """
+    Q-table stored in a growing array, with a map from encoded state to
+    row number.
+    """
+
+    def __init__(self, nb_actions: int = 4, dtype="float32",
+                 capacity: int = 1024):
+        self.values = np.zeros((capacity, nb_actions), dtype=dtype)
+        self._rows: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._rows
+
+    def slot(self, index: int) -> int:
+        """
+        Get the row of a state, registering it if not present.
+        Rows are stable, but the values array may be reallocated.
+        """
+        row = self._rows.get(index)
+        if row is None:
+            row = len(self._rows)
+            if row == len(self.values):
+                grown = np.zeros(
+                    (2 * len(self.values), self.values.shape[1]),
+                    dtype=self.values.dtype,
+                )
+                grown[:row] = self.values
+                self.values = grown
+            self._rows[index] = row
+        return row
+
+    def slots(self, indexes: np.ndarray) -> np.ndarray:
+        """
+        Same as slot, for an array of encoded states.
+        """
+        return np.fromiter(
+            (self.slot(index) for index in indexes.tolist()),
+            dtype=np.int64, count=len(indexes),
+        )
+
+    def get(self, index: int):
+        """
+        Get the row of a state, or None if not present.
+        """
+        return self._rows.get(index)
+
+    def keys(self) -> np.ndarray:
+        """
+        Get the encoded states present in the table.
+        """
+        return np.fromiter(self._rows, dtype=np.int64, count=len(self._rows))
+
+    def to_dict(self) -> dict[tuple[int, ...], list[float]]:
+        """
+        Export the table in the dict format used by the pickle models.
+        """
+        return {
+            decode_state(index): self.values[row].tolist()
+            for index, row in self._rows.items()
+        }
+
+    def snapshot(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Copy the present states and their rows (see arrays_to_dict).
+        """
+        keys = self.keys()
+        return keys, self.values[:len(keys)].copy()
+
+    def update(self, q_table: dict):
+        """
+        Import the rows of a dict Q-table.
+        """
+        for state, q_values in q_table.items():
+            row = self.slot(encode_state(state))
+            self.values[row] = q_values
+
+
+STORAGES = {
+    "dense": DenseQTable,
+    "sparse": SparseQTable,
+}
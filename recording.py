@@ -0,0 +1,431 @@
+# recording.py
+import argparse
+import struct
+import time
+from typing import NamedTuple
+
+from board import Board
+from food import Food
+from occupancy import FOOD_FLAGS
+import snake
+
+# A log starts with _MAGIC and _VERSION, then holds one block per episode:
+#   _BLOCK header: block length (after this field), episode number, board
+#   size, end reason, score, head cell, direction, number of apples,
+#   number of actions, number of spawns
+#   apples: cell (uint16) and color (uint8) of each apple at the start
+#   actions: one byte per move (index in DIRECTIONS)
+#   spawns: cell (uint16) of each apple added during the game
+# Cells are y * size + x, all numbers are little-endian.
+# The layout and the spawns are stored rather than the seed, so a game
+# replays the same whatever the random source was.
+_MAGIC = b"L2SR"
+_VERSION = 1
+_BLOCK = struct.Struct("<IIHBiHBBII")
+_APPLE = struct.Struct("<HB")
+# Largest board side whose cells fit in a uint16
+MAX_SIZE = 256
+
+# Action index -> snake direction, same order as Agent.actions
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+_DIRECTION_CODES = {(0, -1): 0, (0, 1): 1, (-1, 0): 2, (1, 0): 3}
+# End reason codes (see Board.get_end_reason), 0 for an unfinished game
+REASONS = (None, "wall", "body", "starved", "full")
+_REASON_CODES = {reason: code for code, reason in enumerate(REASONS)}
+_COLORS = ("GREEN", "RED")
+_COLOR_CODES = {"GREEN": 0, "RED": 1}
+
+
+def _check_size(size: int):
+    if size > MAX_SIZE:
+        raise ValueError(
+            f"Only boards up to {MAX_SIZE} cells per side are recorded"
+            f" (size={size})."
+        )
+
+
+class Episode(NamedTuple):
+    """
+    A recorded game: its starting layout, the moves played and where the
+    eaten apples were replaced.
+    """
+
+    number: int
+    size: int
+    reason: str | None
+    score: int
+    head: tuple
+    direction: str
+    food: tuple
+    actions: bytes
+    spawns: tuple
+
+    @property
+    def steps(self) -> int:
+        return len(self.actions)
+
+
+class EpisodeRecorder:
+    """
+    Append the games of RecordingBoards to a binary log, about one byte
+    per move. Episodes are numbered in the order they end. causes keeps
+    only the games that ended that way (None for unfinished games), the
+    others are counted but not written.
+    """
+
+    def __init__(self, filename: str, causes=None,
+                 buffer_size: int = 1 << 16):
+        if causes is not None:
+            unknown = set(causes) - set(REASONS)
+            if unknown:
+                raise ValueError(f"Unknown end reasons: {sorted(unknown)}")
+            causes = set(causes)
+        self.filename = filename
+        self.causes = causes
+        self.episodes = 0
+        self.written = 0
+        self._file = open(filename, "wb", buffering=buffer_size)
+        self._file.write(_MAGIC + bytes([_VERSION]))
+
+    def write(self, size: int, head: tuple, direction: str, food: list,
+              actions: bytes, spawns: list, score: int, reason: str | None):
+        """
+        Write one episode. food lists the (position, color) of the apples
+        at the start.
+        """
+        number = self.episodes
+        self.episodes += 1
+        if self.causes is not None and reason not in self.causes:
+            return
+        _check_size(size)
+        apples = b"".join(
+            _APPLE.pack(y * size + x, _COLOR_CODES[color])
+            for (x, y), color in food
+        )
+        cells = struct.pack(
+            f"<{len(spawns)}H", *(y * size + x for x, y in spawns)
+        )
+        length = (
+            _BLOCK.size - 4 + len(apples) + len(actions) + len(cells)
+        )
+        self._file.write(_BLOCK.pack(
+            length, number, size, _REASON_CODES[reason], score,
+            head[1] * size + head[0], DIRECTIONS.index(direction),
+            len(food), len(actions), len(spawns),
+        ))
+        self._file.write(apples)
+        self._file.write(actions)
+        self._file.write(cells)
+        self.written += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RecordingBoard(Board):
+    """
+    Board that records every game it plays to an EpisodeRecorder.
+    A game is written when the board is reset, or by finish.
+    """
+
+    def __init__(self, recorder: EpisodeRecorder, size=10, rng=None):
+        # Checked now rather than when the first game is written
+        _check_size(size)
+        self._recorder = recorder
+        self._actions = bytearray()
+        self._spawns = []
+        self._layout = None
+        super().__init__(size, rng)
+        self._begin()
+
+    def _begin(self):
+        self._actions = bytearray()
+        self._spawns = []
+        if self._snake is None:
+            self._layout = None
+            return
+        self._layout = (
+            self._snake.get_body()[0],
+            DIRECTIONS[_DIRECTION_CODES[self._snake.get_direction()]],
+            [(f.get_position(), f.get_color()) for f in self._food],
+        )
+
+    def finish(self):
+        """
+        Write the game played since the last reset, if it made a move.
+        """
+        if self._layout is not None and self._actions:
+            head, direction, food = self._layout
+            self._recorder.write(
+                self._size, head, direction, food, bytes(self._actions),
+                self._spawns, self._score, self._end_reason,
+            )
+        self._actions = bytearray()
+        self._spawns = []
+
+    def reset(self):
+        self.finish()
+        super().reset()
+        self._begin()
+
+    def add_food(self, color: str):
+        position = super().add_food(color)
+        if position != 404:
+            self._spawns.append(position)
+        return position
+
+    def update(self):
+        if not self._gameOver:
+            self._actions.append(
+                _DIRECTION_CODES[self._snake.get_direction()]
+            )
+        return super().update()
+
+
+class ReplayBoard(Board):
+    """
+    Board set up from a recorded episode: the snake and the apples start
+    where they were, and eaten apples are replaced where they were.
+    Nothing is drawn at random.
+    """
+
+    def __init__(self, episode: Episode):
+        self._episode = episode
+        self._spawns = iter(episode.spawns)
+        super().__init__(episode.size)
+
+    def reset(self):
+        self._spawns = iter(self._episode.spawns)
+        super().reset()
+
+    def set_snake(self):
+        self._grid.clear()
+        self._food = []
+        self._snake = snake.Snake(
+            self._episode.head, self._episode.direction, self._grid
+        )
+
+    def set_food(self):
+        self._food = []
+        for position, color in self._episode.food:
+            self._grid.add(position, FOOD_FLAGS[color])
+            self._food.append(Food(position, color))
+
+    def add_food(self, color: str):
+        if not self._grid.nb_free():
+            return 404
+        position = next(self._spawns, None)
+        if position is None:
+            raise ValueError(
+                f"Episode {self._episode.number}: more apples eaten than"
+                " recorded."
+            )
+        self._food.append(Food(position, color))
+        self._grid.add(position, FOOD_FLAGS[color])
+        return position
+
+
+def read_episodes(filename: str, causes=None, numbers=None):
+    """
+    Yield the episodes of a log, in order. causes and numbers keep only
+    some of them, the others are skipped without being decoded.
+    """
+    if causes is not None:
+        causes = {_REASON_CODES[cause] for cause in causes}
+    if numbers is not None:
+        numbers = set(numbers)
+    with open(filename, "rb") as f:
+        header = f.read(len(_MAGIC) + 1)
+        if header[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{filename} is not an episode log.")
+        if header[len(_MAGIC)] != _VERSION:
+            raise ValueError(
+                f"{filename}: unsupported version {header[len(_MAGIC)]}."
+            )
+        while True:
+            data = f.read(_BLOCK.size)
+            if not data:
+                return
+            if len(data) < _BLOCK.size:
+                raise ValueError(f"{filename} is truncated.")
+            (length, number, size, reason, score, head, direction,
+             nb_apples, nb_actions, nb_spawns) = _BLOCK.unpack(data)
+            rest = length - (_BLOCK.size - 4)
+            if (
+                causes is not None and reason not in causes
+                or numbers is not None and number not in numbers
+            ):
+                f.seek(rest, 1)
+                continue
+            data = f.read(rest)
+            if len(data) < rest:
+                raise ValueError(f"{filename} is truncated.")
+            food = []
+            for i in range(nb_apples):
+                cell, color = _APPLE.unpack_from(data, i * _APPLE.size)
+                food.append(((cell % size, cell // size), _COLORS[color]))
+            start = nb_apples * _APPLE.size
+            actions = data[start:start + nb_actions]
+            spawns = struct.unpack_from(
+                f"<{nb_spawns}H", data, start + nb_actions
+            )
+            yield Episode(
+                number, size, REASONS[reason], score,
+                (head % size, head // size), DIRECTIONS[direction],
+                tuple(food), actions,
+                tuple((cell % size, cell // size) for cell in spawns),
+            )
+
+
+def replay(episode: Episode, on_step=None) -> ReplayBoard:
+    """
+    Play the moves of an episode again, without an agent.
+    on_step(board, step) is called after every move.
+    Raise ValueError if the game does not end as it was recorded.
+    """
+    board = ReplayBoard(episode)
+    for step, code in enumerate(episode.actions, 1):
+        board.get_snake().set_direction(DIRECTIONS[code])
+        board.update()
+        if on_step:
+            on_step(board, step)
+    if (
+        board.get_score() != episode.score
+        or board.get_end_reason() != episode.reason
+    ):
+        raise ValueError(
+            f"Episode {episode.number} replayed to score"
+            f" {board.get_score()} ({board.get_end_reason()}) instead of"
+            f" {episode.score} ({episode.reason})."
+        )
+    return board
+
+
+def show(episodes, cell_size: int = 32, fps: float = 10):
+    """
+    Replay episodes in a window, at fps moves per second (0 = as fast as
+    possible). Space pauses, N skips to the next episode, Escape quits.
+    """
+    import pygame
+
+    from render import Renderer, ensure_screen
+
+    pygame.init()
+    clock = pygame.time.Clock()
+    caption = None
+    try:
+        for episode in episodes:
+            renderer = Renderer(
+                ensure_screen(episode.size, cell_size), cell_size
+            )
+            board = ReplayBoard(episode)
+            renderer.draw(board)
+            step = 0
+            paused = False
+            while step < episode.steps:
+                skip = False
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        return
+                    if event.type == pygame.WINDOWEXPOSED:
+                        renderer.invalidate()
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_ESCAPE:
+                            return
+                        elif event.key == pygame.K_SPACE:
+                            paused = not paused
+                        elif event.key == pygame.K_n:
+                            skip = True
+                if skip:
+                    break
+                if not paused:
+                    board.get_snake().set_direction(
+                        DIRECTIONS[episode.actions[step]]
+                    )
+                    board.update()
+                    step += 1
+                renderer.draw(board)
+                text = (
+                    f"Episode {episode.number} - Step {step}/{episode.steps}"
+                    f" - Score {board.get_score()}"
+                )
+                if text != caption:
+                    caption = text
+                    pygame.display.set_caption(caption)
+                if paused:
+                    clock.tick(60)
+                elif fps > 0:
+                    clock.tick(fps)
+    finally:
+        pygame.quit()
+
+
+def format_episode(episode: Episode) -> str:
+    return (
+        f"{episode.number:>9} {episode.size:>5} {episode.steps:>7}"
+        f" {episode.score:>7} {episode.reason or 'unfinished'}"
+    )
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="List, check or watch the games of an episode log.",
+    )
+    parser.add_argument("log", help="episode log to read")
+    parser.add_argument(
+        "--episode", type=int, nargs="+", default=None, metavar="N",
+        help="only these episode numbers",
+    )
+    parser.add_argument(
+        "--cause", nargs="+", default=None,
+        choices=[reason for reason in REASONS if reason],
+        help="only the games that ended this way",
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="list the episodes"
+    )
+    parser.add_argument(
+        "--check", action="store_true",
+        help="replay the episodes headless and check how they end",
+    )
+    parser.add_argument(
+        "--fps", type=float, default=10,
+        help="moves per second in the window (0 = as fast as possible)",
+    )
+    parser.add_argument("--cell-size", type=int, default=32)
+    args = parser.parse_args(argv)
+
+    episodes = read_episodes(args.log, args.cause, args.episode)
+    if args.list:
+        print(f"{'episode':>9} {'size':>5} {'steps':>7} {'score':>7} end")
+        for episode in episodes:
+            print(format_episode(episode))
+    elif args.check:
+        count = steps = 0
+        start = time.perf_counter()
+        for episode in episodes:
+            replay(episode)
+            count += 1
+            steps += episode.steps
+        seconds = time.perf_counter() - start
+        print(
+            f"{count} episodes ({steps} moves) replayed as recorded"
+            f" in {seconds:.2f}s"
+        )
+    else:
+        show(episodes, args.cell_size, args.fps)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
+import numpy as np
 import pygame
 
+from occupancy import BODY, GREEN, HEAD, RED
+
 # Colors
 BG_COLOR = (18, 18, 18)
 GRID_COLOR = (35, 35, 35)
@@ -16,53 +19,142 @@ def ensure_screen(size: int, cell_size: int = 32):
     return pygame.display.set_mode((width, height))
 
 
-def render(board, screen, cell_size: int = 32, draw_grid: bool = True):
-    """
-    Render the current board state onto the provided pygame screen.
-    Call inside your game loop after board.update().
-    """
-    size = board.get_size()
-    screen.fill(BG_COLOR)
-
+def draw_background(surface, size: int, cell_size: int = 32,
+                    draw_grid: bool = True):
+    """Fill the surface with the empty board and its grid lines."""
+    surface.fill(BG_COLOR)
     if draw_grid:
         for i in range(size + 1):
             pygame.draw.line(
-                screen,
+                surface,
                 GRID_COLOR,
                 (i * cell_size, 0),
                 (i * cell_size, size * cell_size),
             )
             pygame.draw.line(
-                screen,
+                surface,
                 GRID_COLOR,
                 (0, i * cell_size),
                 (size * cell_size, i * cell_size),
             )
 
-    # Draw food
-    for food in board.get_food():
-        fx, fy = food.get_position()
-        color = (
-            FOOD_GREEN_COLOR if food.get_color() == "GREEN" else FOOD_RED_COLOR
+
+def draw_cell(surface, rect, flags: int, cell_size: int = 32):
+    """Draw the food and snake part of one cell, food first."""
+    if flags & GREEN:
+        pygame.draw.circle(
+            surface, FOOD_GREEN_COLOR, rect.center, cell_size // 3
+        )
+    elif flags & RED:
+        pygame.draw.circle(
+            surface, FOOD_RED_COLOR, rect.center, cell_size // 3
         )
+    if flags & HEAD:
+        pygame.draw.rect(
+            surface, SNAKE_HEAD_COLOR, rect, border_radius=6
+        )
+    elif flags & BODY:
+        pygame.draw.rect(
+            surface, SNAKE_BODY_COLOR, rect, border_radius=6
+        )
+
+
+def render(board, screen, cell_size: int = 32, draw_grid: bool = True):
+    """
+    Render the current board state onto the provided pygame screen.
+    Call inside your game loop after board.update().
+    This redraws the whole screen; Renderer only redraws what changed.
+    """
+    size = board.get_size()
+    draw_background(screen, size, cell_size, draw_grid)
+
+    # Draw food then snake, cell by cell from the occupancy grid
+    for index, flags in enumerate(board.get_grid().get_cells()):
+        if not flags:
+            continue
         rect = pygame.Rect(
-            fx * cell_size, fy * cell_size, cell_size, cell_size)
-        pygame.draw.circle(screen, color, rect.center, cell_size // 3)
-
-    # Draw snake
-    snake = board.get_snake()
-    if snake:
-        for i, (sx, sy) in enumerate(snake.get_body()):
-            rect = pygame.Rect(
-                sx * cell_size, sy * cell_size, cell_size, cell_size
-            )
-            if i == 0:
-                pygame.draw.rect(
-                    screen, SNAKE_HEAD_COLOR, rect, border_radius=6
-                )
-            else:
-                pygame.draw.rect(
-                    screen, SNAKE_BODY_COLOR, rect, border_radius=6
-                )
+            (index % size) * cell_size, (index // size) * cell_size,
+            cell_size, cell_size
+        )
+        draw_cell(screen, rect, flags, cell_size)
 
     pygame.display.flip()
+
+
+class Renderer:
+    """
+    Incremental renderer. The empty grid is drawn once on a cached
+    background surface, and each frame only the cells whose occupancy
+    flags changed since the previous frame are redrawn and sent to the
+    display with pygame.display.update(rects).
+    A frame where nothing changed draws nothing.
+    """
+
+    def __init__(self, screen, cell_size: int = 32, draw_grid: bool = True):
+        self.screen = screen
+        self.cell_size = cell_size
+        self.draw_grid = draw_grid
+        self._size = 0
+        self._background = None
+        # Cell flags shown on screen, None when a full redraw is needed
+        self._shown: bytes | None = None
+
+    def invalidate(self):
+        """
+        Redraw the whole screen on the next frame (after the window was
+        exposed or the screen drawn over).
+        """
+        self._shown = None
+
+    def draw(self, board) -> bool:
+        """
+        Draw the board. Return False if the frame was skipped.
+        """
+        return self.draw_cells(board.get_size(), board.get_grid().get_cells())
+
+    def draw_cells(self, size: int, cells) -> bool:
+        """
+        Draw a board given its size and its cell flags (the bytes of an
+        occupancy grid). Return False if the frame was skipped.
+        """
+        if size != self._size:
+            self._size = size
+            self._background = self.screen.copy()
+            draw_background(
+                self._background, size, self.cell_size, self.draw_grid
+            )
+            self._shown = None
+
+        if self._shown is None:
+            self.screen.blit(self._background, (0, 0))
+            for index, flags in enumerate(cells):
+                if flags:
+                    draw_cell(
+                        self.screen, self._rect(index), flags, self.cell_size
+                    )
+            self._shown = bytes(cells)
+            pygame.display.flip()
+            return True
+
+        changed = np.flatnonzero(
+            np.frombuffer(cells, dtype=np.uint8)
+            != np.frombuffer(self._shown, dtype=np.uint8)
+        )
+        if not len(changed):
+            return False
+        rects = []
+        for index in changed.tolist():
+            rect = self._rect(index)
+            self.screen.blit(self._background, rect, rect)
+            draw_cell(self.screen, rect, cells[index], self.cell_size)
+            rects.append(rect)
+        self._shown = bytes(cells)
+        pygame.display.update(rects)
+        return True
+
+    def _rect(self, index: int):
+        return pygame.Rect(
+            (index % self._size) * self.cell_size,
+            (index // self._size) * self.cell_size,
+            self.cell_size, self.cell_size,
+        )
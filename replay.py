@@ -0,0 +1,114 @@
+# replay.py
+import numpy as np
+
+from q_table import encode_state
+
+
+class ReplayBuffer:
+    """
+    Ring buffer of (state, action, reward, next state, done) transitions,
+    in preallocated arrays. States are stored encoded (see
+    q_table.encode_state). Once full, the oldest transitions are
+    overwritten.
+    Sampling is uniform, or prioritized by the size of the last temporal
+    difference error of each transition.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100_000,
+        prioritized: bool = False,
+        alpha: float = 0.6,
+        beta: float = 0.4,
+        seed=None,
+    ):
+        """
+        alpha: how much the priorities count (0 = uniform).
+        beta: how much the importance-sampling weights correct the bias
+        of prioritized sampling (1 = fully).
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1.")
+        self.capacity = capacity
+        self.prioritized = prioritized
+        self.alpha = alpha
+        self.beta = beta
+        self.states = np.zeros(capacity, dtype=np.int64)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float64)
+        self.next_states = np.zeros(capacity, dtype=np.int64)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.priorities = np.zeros(capacity, dtype=np.float64)
+        self._max_priority = 1.0
+        self._next = 0
+        self._size = 0
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, state, action: int, reward: float, next_state,
+            done: bool):
+        """
+        Store a transition. States are 12-tuples or encoded integers.
+        A new transition gets the highest priority seen so far, so it is
+        sampled at least once soon.
+        """
+        if not isinstance(state, (int, np.integer)):
+            state = encode_state(state)
+        if not isinstance(next_state, (int, np.integer)):
+            next_state = encode_state(next_state)
+        i = self._next
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.priorities[i] = self._max_priority
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def sample(self, batch_size: int):
+        """
+        Draw batch_size transitions, with replacement.
+        Return their indexes, states, actions, rewards, next states, dones
+        and importance-sampling weights (all ones when uniform).
+        """
+        size = self._size
+        if not size:
+            raise ValueError("Cannot sample an empty replay buffer.")
+        if self.prioritized:
+            scaled = self.priorities[:size] ** self.alpha
+            cumulative = np.cumsum(scaled)
+            total = cumulative[-1]
+            indexes = np.searchsorted(
+                cumulative, self._rng.random(batch_size) * total,
+                side="right",
+            )
+            np.minimum(indexes, size - 1, out=indexes)
+            weights = (size * scaled[indexes] / total) ** -self.beta
+            weights /= weights.max()
+        else:
+            indexes = self._rng.integers(0, size, batch_size)
+            weights = np.ones(batch_size)
+        return (
+            indexes,
+            self.states[indexes],
+            self.actions[indexes],
+            self.rewards[indexes],
+            self.next_states[indexes],
+            self.dones[indexes],
+            weights,
+        )
+
+    def update_priorities(self, indexes: np.ndarray, errors: np.ndarray,
+                          epsilon: float = 1e-3):
+        """
+        Set the priorities of sampled transitions from their new
+        temporal difference errors.
+        """
+        if not self.prioritized:
+            return
+        priorities = np.abs(errors) + epsilon
+        self.priorities[indexes] = priorities
+        self._max_priority = max(self._max_priority, float(priorities.max()))
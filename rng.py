@@ -0,0 +1,84 @@
+# rng.py
+import itertools
+import random
+
+import numpy as np
+
+
+class BatchRandom:
+    """
+    Random numbers drawn in batches from a NumPy Generator, then consumed
+    one at a time. It has the methods of the random module that Board and
+    Agent use, so either can be given as their rng.
+    The same seed always gives the same sequence.
+    """
+
+    def __init__(self, seed=None, batch_size: int = 4096):
+        """
+        seed: an integer, a sequence of integers, a SeedSequence or a
+        Generator (None draws fresh entropy from the OS).
+        """
+        if isinstance(seed, np.random.Generator):
+            self._generator = seed
+        else:
+            self._generator = np.random.default_rng(seed)
+        self._batch_size = batch_size
+        # C iterator over the draws: Python code only runs once per batch
+        self.random = itertools.chain.from_iterable(
+            self._batches()
+        ).__next__
+
+    def _batches(self):
+        while True:
+            yield self._generator.random(self._batch_size).tolist()
+
+    def randrange(self, n: int) -> int:
+        """
+        Random integer in [0, n).
+        """
+        return int(self.random() * n)
+
+    def randint(self, a: int, b: int) -> int:
+        """
+        Random integer in [a, b], both included.
+        """
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq):
+        """
+        Random element of a non-empty sequence.
+        """
+        return seq[int(self.random() * len(seq))]
+
+    def spawn(self, count: int) -> list["BatchRandom"]:
+        """
+        Create independent streams, for example one per board and agent
+        or one per worker.
+        """
+        return [
+            BatchRandom(generator, self._batch_size)
+            for generator in self._generator.spawn(count)
+        ]
+
+
+def make_rng(rng=None):
+    """
+    Get the random source of a Board or an Agent: the random module when
+    rng is None (shared global state, as before), rng itself when it
+    already draws numbers (random.Random, BatchRandom), or a BatchRandom
+    seeded with it.
+    """
+    if rng is None:
+        return random
+    if isinstance(rng, np.random.Generator):
+        return BatchRandom(rng)
+    if hasattr(rng, "random") and hasattr(rng, "choice"):
+        return rng
+    return BatchRandom(rng)
+
+
+def streams(seed, count: int = 2) -> list[BatchRandom]:
+    """
+    Independent streams derived from one seed (board, agent, ...).
+    """
+    return BatchRandom(seed).spawn(count)
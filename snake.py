@@ -1,4 +1,7 @@
 # snake.py
+from collections import deque
+
+from occupancy import BODY, HEAD, OccupancyGrid
 
 
 class Snake:
@@ -11,19 +14,24 @@ class Snake:
 
     _position: tuple
     _direction: tuple
-    _body: list[tuple]
+    _body: deque[tuple]
+    _cells: set[tuple]
     _growing: bool
     _is_alive: bool
+    _grid: OccupancyGrid
 
     # CONSTRUCTOR
 
-    def __init__(self, start_position: tuple, direction: str):
+    def __init__(self, start_position: tuple, direction: str,
+                 grid: OccupancyGrid = None):
         """
         Initialize the snake with a starting position and direction.
+        If a grid is given, the body is kept marked on it.
         """
+        self._grid = grid
         self._direction = None
         self.set_direction(direction)
-        self.set_position(start_position)  # body is a list of tuples
+        self.set_position(start_position)  # body is a deque of tuples
         self._growing = False
         self._is_alive = True
 
@@ -58,12 +66,19 @@ class Snake:
     def set_position(self, position: tuple):
         """
         Set the snake's position of entire body.
+        The body never overlaps itself (moving into it is a collision),
+        so a set is enough to test membership.
         """
-        self._body = [position]
+        self._body = deque([position])
         for i in range(1, 3):
             body_position_x = position[0] - i * self._direction[0]
             body_position_y = position[1] - i * self._direction[1]
             self._body.append((body_position_x, body_position_y))
+        self._cells = set(self._body)
+        if self._grid is not None:
+            for segment in self._body:
+                self._grid.add(segment, BODY)
+            self._grid.add(position, HEAD)
 
     # Getters
 
@@ -82,12 +97,24 @@ class Snake:
         next_y = head_y + self._direction[1]
         return (next_x, next_y)
 
-    def get_body(self) -> list[tuple]:
+    def get_body(self) -> deque[tuple]:
         """
-        Get the current body positions of the snake.
+        Get the current body positions of the snake, head first.
         """
         return self._body
 
+    def get_cells(self) -> set[tuple]:
+        """
+        Get the set of positions covered by the snake.
+        """
+        return self._cells
+
+    def contains(self, position: tuple) -> bool:
+        """
+        Check if a position is covered by the snake.
+        """
+        return position in self._cells
+
     def get_direction(self) -> tuple:
         """
         Get the current direction of the snake.
@@ -113,10 +140,17 @@ class Snake:
         """
         Move the snake to the next position.
         """
-        self._body.insert(0, next_position)  # Add new head
+        if self._grid is not None:
+            self._grid.remove(self._body[0], HEAD)
+            self._grid.add(next_position, BODY | HEAD)
+        self._body.appendleft(next_position)  # Add new head
+        self._cells.add(next_position)
 
         if not self._growing:
-            self._body.pop()  # Remove tail
+            tail = self._body.pop()  # Remove tail
+            self._cells.discard(tail)
+            if self._grid is not None:
+                self._grid.remove(tail, BODY)
         else:
             self._growing = False  # Reset growing flag
 
@@ -128,6 +162,9 @@ class Snake:
             self._growing = True
         elif color_apple == "RED":
             if len(self._body) > 1:
-                self._body.pop()  # Remove tail segment
+                tail = self._body.pop()  # Remove tail segment
+                self._cells.discard(tail)
+                if self._grid is not None:
+                    self._grid.remove(tail, BODY)
             else:
                 self.die()
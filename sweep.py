@@ -0,0 +1,326 @@
+# sweep.py
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from multiprocessing import Pool
+
+from agent import Agent
+from evaluate import play_greedy, summarize
+from trainer import train
+
+# Swept values, with the defaults of Agent and trainer.train.
+# epsilon_decay None means scheduled from nb_sessions
+# (see Agent.schedule_epsilon).
+DEFAULTS = {
+    "lr": 0.1,
+    "gamma": 0.9,
+    "epsilon_min": 0.01,
+    "epsilon_decay": None,
+    "board_size": 10,
+    "nb_sessions": 100,
+}
+
+# Parameters that only take integers
+_INTEGERS = ("board_size", "nb_sessions")
+
+_COLUMNS = [
+    "rank", "lr", "gamma", "epsilon_min", "epsilon_decay", "board_size",
+    "nb_sessions", "mean_score", "std_score", "p50_score", "max_score",
+    "mean_length", "mean_steps", "causes", "states", "train_seconds",
+    "eval_seconds",
+]
+
+
+def grid(space: dict[str, list]) -> list[dict]:
+    """
+    Every combination of the values of space. Missing parameters keep
+    their default.
+    """
+    names = list(space)
+    return [
+        {**DEFAULTS, **dict(zip(names, values))}
+        for values in itertools.product(*(space[name] for name in names))
+    ]
+
+
+def random_configs(space: dict, count: int, seed: int = 0) -> list[dict]:
+    """
+    count configurations drawn at random. A list gives the values to
+    choose from, a (low, high) tuple a uniform range (of integers if both
+    bounds are integers).
+    """
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(count):
+        config = dict(DEFAULTS)
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    config[name] = rng.randint(low, high)
+                else:
+                    config[name] = rng.uniform(low, high)
+            else:
+                config[name] = rng.choice(values)
+        configs.append(config)
+    return configs
+
+
+def _sweep_worker(job):
+    """
+    Train one configuration headless, save its model, then evaluate it
+    with greedy games.
+    """
+    index, config, games, seed, max_steps, directory = job
+
+    agent = Agent()
+    agent.lr = config["lr"]
+    agent.gamma = config["gamma"]
+    agent.epsilon_min = config["epsilon_min"]
+    if config["epsilon_decay"] is None:
+        agent.schedule_epsilon(config["nb_sessions"])
+    else:
+        agent.epsilon_decay = config["epsilon_decay"]
+    decay = agent.epsilon_decay
+
+    start = time.perf_counter()
+    train(config["board_size"], config["nb_sessions"], agent=agent,
+          save=False, seed=(seed, index))
+    train_seconds = time.perf_counter() - start
+    model_path = os.path.join(directory, f"config_{index}.pkl")
+    agent.save_q_table(model_path)
+    states = len(agent.q_table)
+
+    agent.epsilon = 0.0
+    start = time.perf_counter()
+    played = [
+        play_greedy(agent, config["board_size"], seed + i, max_steps)
+        for i in range(games)
+    ]
+    eval_seconds = time.perf_counter() - start
+    return {
+        "index": index,
+        "config": {**config, "epsilon_decay": decay},
+        "summary": summarize(played, eval_seconds),
+        "states": states,
+        "train_seconds": train_seconds,
+        "eval_seconds": eval_seconds,
+        "model_path": model_path,
+    }
+
+
+def sweep(
+    configs: list[dict],
+    games: int = 50,
+    workers: int | None = None,
+    seed: int = 0,
+    max_steps: int = 2000,
+    best_path: str | None = "models/sweep_best.pkl",
+    progress: bool = False,
+) -> list[dict]:
+    """
+    Train and evaluate every configuration across a process pool.
+    Every configuration is evaluated on the same games (seed + i).
+    Return the results ranked by mean greedy score, and save the model
+    of the best one to best_path.
+    """
+    if games < 1:
+        raise ValueError("games must be at least 1.")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(configs)))
+    directory = tempfile.mkdtemp(prefix="sweep_")
+    jobs = [
+        (index, config, games, seed, max_steps, directory)
+        for index, config in enumerate(configs)
+    ]
+
+    pbar = None
+    if progress:
+        try:
+            from tqdm import tqdm
+            pbar = tqdm(total=len(jobs), desc="Sweep", unit="config")
+        except ImportError:
+            print(
+                "tqdm is not installed. "
+                "Progress bar will be disabled during the sweep."
+            )
+
+    results = []
+    try:
+        with Pool(workers) as pool:
+            for result in pool.imap_unordered(_sweep_worker, jobs):
+                results.append(result)
+                if pbar:
+                    pbar.update(1)
+        results.sort(key=lambda result: (
+            -result["summary"]["score"]["mean"],
+            -result["summary"]["max_length"]["mean"],
+            result["index"],
+        ))
+        if best_path and results:
+            best_directory = os.path.dirname(best_path)
+            if best_directory:
+                os.makedirs(best_directory, exist_ok=True)
+            shutil.move(results[0]["model_path"], best_path)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+        if pbar:
+            pbar.close()
+
+    # The other models were deleted with the temporary directory
+    for rank, result in enumerate(results, 1):
+        result["rank"] = rank
+        result["model_path"] = best_path if rank == 1 else None
+    return results
+
+
+def to_rows(results: list[dict]) -> list[dict]:
+    """
+    Flatten the results into one row per configuration (see _COLUMNS).
+    """
+    rows = []
+    for result in results:
+        summary = result["summary"]
+        rows.append({
+            "rank": result["rank"],
+            **{name: result["config"][name] for name in DEFAULTS},
+            "mean_score": summary["score"]["mean"],
+            "std_score": summary["score"]["std"],
+            "p50_score": summary["score"]["p50"],
+            "max_score": summary["score"]["max"],
+            "mean_length": summary["max_length"]["mean"],
+            "mean_steps": summary["steps"]["mean"],
+            "causes": " ".join(
+                f"{cause}={count}"
+                for cause, count in sorted(summary["causes"].items())
+            ),
+            "states": result["states"],
+            "train_seconds": result["train_seconds"],
+            "eval_seconds": result["eval_seconds"],
+        })
+    return rows
+
+
+def write_csv(results: list[dict], filename: str):
+    with open(filename, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=_COLUMNS)
+        writer.writeheader()
+        writer.writerows(to_rows(results))
+
+
+def write_json(results: list[dict], filename: str):
+    with open(filename, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def format_report(results: list[dict], limit: int = 20) -> str:
+    """
+    Format the best results as a table.
+    """
+    lines = [
+        f"{'rank':>4} {'lr':>7} {'gamma':>6} {'eps_min':>8}"
+        f" {'eps_decay':>10} {'size':>5} {'sessions':>9}"
+        f" {'score':>8} {'p50':>6} {'length':>7}  causes"
+    ]
+    for row in to_rows(results)[:limit]:
+        lines.append(
+            f"{row['rank']:>4} {row['lr']:>7.4g} {row['gamma']:>6.4g}"
+            f" {row['epsilon_min']:>8.4g} {row['epsilon_decay']:>10.6g}"
+            f" {row['board_size']:>5} {row['nb_sessions']:>9}"
+            f" {row['mean_score']:>8.1f} {row['p50_score']:>6}"
+            f" {row['mean_length']:>7.1f}  {row['causes']}"
+        )
+    return "\n".join(lines)
+
+
+def _values(text: str):
+    """
+    Parse a swept value: a number, or a low:high range.
+    """
+    def number(part):
+        return float(part) if "." in part or "e" in part else int(part)
+
+    if ":" in text:
+        low, high = text.split(":")
+        return (number(low), number(high))
+    return number(text)
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Train and evaluate a grid or a random sample of"
+        " hyperparameters across processes.",
+    )
+    for name in DEFAULTS:
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", dest=name, nargs="+",
+            type=_values, default=None, metavar="VALUE",
+            help="values to try (low:high ranges with --random)",
+        )
+    parser.add_argument(
+        "--random", type=int, default=0, metavar="N",
+        help="draw N random configurations instead of the full grid",
+    )
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-steps", type=int, default=2000)
+    parser.add_argument("--csv", default=None, help="write the results")
+    parser.add_argument("--json", default=None, help="write the results")
+    parser.add_argument(
+        "--output", default="models/sweep_best.pkl",
+        help="where to save the best model",
+    )
+    args = parser.parse_args(argv)
+    if args.games < 1:
+        parser.error("--games must be at least 1.")
+
+    space = {
+        name: getattr(args, name) for name in DEFAULTS
+        if getattr(args, name) is not None
+    }
+    for name, values in space.items():
+        option = f"--{name.replace('_', '-')}"
+        if name in _INTEGERS:
+            bounds = [
+                bound for value in values
+                for bound in (value if isinstance(value, tuple) else (value,))
+            ]
+            if not all(isinstance(bound, int) for bound in bounds):
+                parser.error(f"{option} only takes integers.")
+        if len(values) > 1 and any(
+            isinstance(value, tuple) for value in values
+        ):
+            parser.error(f"{option}: give either one range or values.")
+    if args.random:
+        space = {
+            name: values[0] if isinstance(values[0], tuple) else values
+            for name, values in space.items()
+        }
+        configs = random_configs(space, args.random, args.seed)
+    else:
+        for name, values in space.items():
+            if any(isinstance(value, tuple) for value in values):
+                parser.error(f"--{name}: ranges need --random.")
+        configs = grid(space)
+
+    results = sweep(
+        configs, games=args.games, workers=args.workers, seed=args.seed,
+        max_steps=args.max_steps, best_path=args.output, progress=True,
+    )
+    print(format_report(results))
+    print(f"Best model saved to {args.output}")
+    if args.csv:
+        write_csv(results, args.csv)
+    if args.json:
+        write_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
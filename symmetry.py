@@ -0,0 +1,115 @@
+# symmetry.py
+
+# The game looks the same after any rotation or reflection of the board,
+# and these move the 4 directions around. Each transform is given as the
+# new index of UP, DOWN, LEFT and RIGHT (the order of the state rays and
+# of the actions). The identity comes first, so a canonical state maps
+# to itself with it.
+TRANSFORMS = (
+    (0, 1, 2, 3),  # identity
+    (3, 2, 0, 1),  # quarter turn clockwise
+    (1, 0, 3, 2),  # half turn
+    (2, 3, 1, 0),  # quarter turn counterclockwise
+    (0, 1, 3, 2),  # left-right mirror
+    (1, 0, 2, 3),  # up-down mirror
+    (2, 3, 0, 1),  # main diagonal
+    (3, 2, 1, 0),  # anti-diagonal
+)
+# Inverse of each transform: canonical action -> action on the board
+INVERSES = tuple(
+    tuple(transform.index(action) for action in range(4))
+    for transform in TRANSFORMS
+)
+
+# Ray offsets of an encoded state (see Board.encode_state): 6 bits per
+# direction, UP first
+_SHIFTS = (18, 12, 6, 0)
+
+# State -> (canonical state, transform index). Few different states occur
+# in practice, the cache is emptied when full.
+_CANONICAL: dict = {}
+_CANONICAL_SIZE = 1 << 20
+
+
+def transform_state(state, transform: tuple):
+    """
+    Move the rays of a state (12-tuple or encoded integer) as the
+    directions are moved by transform.
+    """
+    if isinstance(state, tuple):
+        moved = [None] * 4
+        for direction in range(4):
+            moved[transform[direction]] = state[3 * direction:
+                                                3 * direction + 3]
+        return tuple(value for ray in moved for value in ray)
+    moved = 0
+    for direction, shift in enumerate(_SHIFTS):
+        moved |= (state >> shift & 63) << _SHIFTS[transform[direction]]
+    return moved
+
+
+def _canonicalize(state) -> tuple:
+    """
+    Find the smallest of the 8 transformed states. The tuple order and the
+    integer order agree, so both forms have the same canonical state.
+    """
+    best = None
+    best_index = 0
+    for index, transform in enumerate(TRANSFORMS):
+        moved = transform_state(state, transform)
+        if best is None or moved < best:
+            best = moved
+            best_index = index
+    return best, best_index
+
+
+def canonical_state(state) -> tuple:
+    """
+    Get the canonical form of a state and the index of the transform that
+    gives it: action a on the board is action TRANSFORMS[index][a] in the
+    canonical state, and canonical action c is INVERSES[index][c].
+    """
+    cached = _CANONICAL.get(state)
+    if cached is None:
+        if not isinstance(state, tuple):
+            state = int(state)
+        cached = _canonicalize(state)
+        if len(_CANONICAL) >= _CANONICAL_SIZE:
+            _CANONICAL.clear()
+        _CANONICAL[state] = cached
+    return cached
+
+
+def fold_q_table(q_table: dict) -> dict:
+    """
+    Fold a Q-table learned without symmetry onto the canonical states.
+    The rows of the states with the same canonical form are averaged,
+    once their actions are moved to the canonical order.
+    """
+    sums: dict = {}
+    counts: dict = {}
+    for state, q_values in q_table.items():
+        canonical, index = canonical_state(state)
+        transform = TRANSFORMS[index]
+        row = sums.get(canonical)
+        if row is None:
+            row = sums[canonical] = [0.0] * len(q_values)
+            counts[canonical] = 0
+        for action, value in enumerate(q_values):
+            row[transform[action]] += float(value)
+        counts[canonical] += 1
+    return {
+        state: [value / counts[state] for value in row]
+        for state, row in sums.items()
+    }
+
+
+def fold_visits(visits: dict) -> dict:
+    """
+    Add up the visit counts of the states with the same canonical form.
+    """
+    folded: dict = {}
+    for state, count in visits.items():
+        canonical = canonical_state(state)[0]
+        folded[canonical] = folded.get(canonical, 0) + count
+    return folded
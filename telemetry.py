@@ -0,0 +1,170 @@
+# telemetry.py
+import json
+import sys
+import time
+
+# Levels, each one reports everything of the levels below
+OFF = 0
+SESSION = 1  # one record per finished game
+STEP = 2  # plus the sampled steps: vision, action, score
+LEVELS = {"off": OFF, "session": SESSION, "step": STEP}
+
+
+class Telemetry:
+    """
+    Reports of the game loop. Records are kept in a buffer and written in
+    batches, when the buffer is full or flush_every seconds have passed,
+    instead of one write per line.
+    Only one step out of `every` is reported, and the vision of the
+    other steps is never computed.
+    """
+
+    def __init__(
+        self,
+        level: int | str = STEP,
+        every: int = 1,
+        human: bool = True,
+        stream=None,
+        jsonl: str | None = None,
+        buffer_size: int = 256,
+        flush_every: float = 0.2,
+    ):
+        """
+        human writes the records to stream (stdout by default) in the
+        format of Board.display_vision. jsonl writes them to a file, one
+        JSON object per line.
+        """
+        if isinstance(level, str):
+            if level not in LEVELS:
+                raise ValueError(
+                    f"Invalid level '{level}'. Use {', '.join(LEVELS)}."
+                )
+            level = LEVELS[level]
+        if every < 1:
+            raise ValueError("every must be at least 1.")
+        self.level = level
+        self.every = every
+        self._human = human
+        self._stream = stream
+        self._jsonl = open(jsonl, "w") if jsonl else None
+        self._buffer_size = buffer_size
+        self._flush_every = flush_every
+        self._last_flush = time.monotonic()
+        self._lines: list[str] = []
+        self._records: list[str] = []
+
+    def __bool__(self) -> bool:
+        return self.level > OFF
+
+    def wants_step(self, step: int) -> bool:
+        """
+        Check if a step is sampled.
+        """
+        return self.level >= STEP and step % self.every == 0
+
+    def step(self, board, step: int, action: str):
+        """
+        Report a step if it is sampled: what the snake sees, the action
+        chosen, the score and the step number.
+        """
+        if not self.wants_step(step):
+            return
+        vision = board.get_vision_symbols()
+        score = board.get_score()
+        if self._human:
+            self._lines.append("\nVision (from Head):")
+            for name, line_symbols in vision.items():
+                self._lines.append(f"{name:5} : {' '.join(line_symbols)}")
+            self._lines.append("")
+            self._lines.append(f"Action chosen: {action}")
+            self._lines.append(f"Current score: {score}")
+            self._lines.append(f"Current step: {step}")
+        if self._jsonl:
+            self._records.append(json.dumps({
+                "type": "step",
+                "step": step,
+                "action": action,
+                "score": score,
+                "vision": {
+                    name: "".join(line_symbols)
+                    for name, line_symbols in vision.items()
+                },
+            }))
+        self._maybe_flush()
+
+    def session(self, session: int, score: int, steps: int):
+        """
+        Report a finished game.
+        """
+        if self.level < SESSION:
+            return
+        if self._human:
+            self._lines.append(
+                f"Session {session}: score {score} in {steps} steps"
+            )
+        if self._jsonl:
+            self._records.append(json.dumps({
+                "type": "session",
+                "session": session,
+                "score": score,
+                "steps": steps,
+            }))
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if (
+            len(self._lines) + len(self._records) >= self._buffer_size
+            or time.monotonic() - self._last_flush >= self._flush_every
+        ):
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered records.
+        """
+        self._last_flush = time.monotonic()
+        if self._lines:
+            stream = self._stream if self._stream is not None else sys.stdout
+            stream.write("\n".join(self._lines) + "\n")
+            stream.flush()
+            self._lines.clear()
+        if self._records:
+            self._jsonl.write("\n".join(self._records) + "\n")
+            self._jsonl.flush()
+            self._records.clear()
+
+    def close(self):
+        """
+        Write the buffered records and close the JSON-lines file.
+        """
+        self.flush()
+        if self._jsonl:
+            self._jsonl.close()
+            self._jsonl = None
+
+
+class NullTelemetry:
+    """
+    Telemetry that reports nothing, used when telemetry is disabled.
+    """
+
+    def __bool__(self) -> bool:
+        return False
+
+    def wants_step(self, step: int) -> bool:
+        return False
+
+    def step(self, board, step: int, action: str):
+        pass
+
+    def session(self, session: int, score: int, steps: int):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_TELEMETRY = NullTelemetry()
@@ -0,0 +1,52 @@
+# tests/test_encode_state.py
+import random
+
+import pytest
+
+from agent import get_state_tuple
+from board import Board
+from q_table import encode_state
+from trainer import DIRECTIONS
+
+
+# Move of each direction, same order as DIRECTIONS
+_MOVES = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+
+def _positions(board: Board, seed: int):
+    """
+    Yield the board before the first move and after every move of a game
+    played at random, avoiding the walls and the body when possible so
+    the snake grows.
+    """
+    rng = random.Random(seed)
+    yield board
+    while not board.is_gameOver():
+        snake = board.get_snake()
+        head_x, head_y = snake.get_body()[0]
+        current = snake.get_direction()
+        safe = []
+        for direction, (dx, dy) in zip(DIRECTIONS, _MOVES):
+            head = (head_x + dx, head_y + dy)
+            if (dx, dy) == (-current[0], -current[1]):
+                continue
+            if board.is_valid_position(head) and not snake.contains(head):
+                safe.append(direction)
+        snake.set_direction(rng.choice(safe or DIRECTIONS))
+        board.update()
+        yield board
+
+
+@pytest.mark.parametrize("size", range(6, 26))
+def test_encode_state_matches_vision(size):
+    moves = 0
+    for game in range(5):
+        board = Board(size, rng=(size, game))
+        for position in _positions(board, size * 100 + game):
+            if position.is_gameOver():
+                break
+            expected = get_state_tuple(position.get_snake_vision())
+            assert position.encode_state(True) == expected
+            assert position.encode_state() == encode_state(expected)
+            moves += 1
+    assert moves > 0
@@ -0,0 +1,158 @@
+# trainer.py
+import os
+
+from board import Board
+from agent import Agent
+from profiling import NULL_PROFILER
+from recording import RecordingBoard
+from rng import streams
+from telemetry import NULL_TELEMETRY
+
+# Action index -> snake direction, same order as Agent.actions
+DIRECTIONS = ["UP", "DOWN", "LEFT", "RIGHT"]
+
+
+def train(
+    board_size: int = 10,
+    nb_sessions: int = 100,
+    agent: Agent | None = None,
+    storage: str = "dict",
+    model_path: str | None = None,
+    resume_from: str | None = None,
+    save: bool = True,
+    progress: bool = False,
+    on_step=None,
+    on_session=None,
+    profiler=None,
+    checkpointer=None,
+    board: Board | None = None,
+    telemetry=None,
+    seed=None,
+    recorder=None,
+) -> Agent:
+    """
+    Train an agent headless, without pygame.
+    on_step(step, reward) is called after every move and
+    on_session(session, score) after every finished game.
+    resume_from continues training a saved model with its stored epsilon,
+    session count and hyperparameters.
+    The Q-table is saved to model_path (models/q_table_<n>.pkl by default,
+    n being the total number of sessions learned).
+    profiler (a profiling.PhaseProfiler) times vision, action, update
+    and learn. checkpointer (a checkpoint.Checkpointer) saves the Q-table
+    periodically, and once more if training is interrupted.
+    board plays the games (a new Board(board_size) by default).
+    telemetry (a telemetry.Telemetry) reports the steps and sessions.
+    seed makes the run reproducible: the board and the agent draw from
+    two streams of this seed (see rng.streams).
+    recorder (a recording.EpisodeRecorder) records the games of the
+    default board.
+    """
+    if profiler is None:
+        profiler = NULL_PROFILER
+    if telemetry is None:
+        telemetry = NULL_TELEMETRY
+
+    pbar = None
+    if progress:
+        try:
+            from tqdm import tqdm
+            pbar = tqdm(total=nb_sessions, desc="Training", unit="session")
+        except ImportError:
+            print(
+                "tqdm is not installed. "
+                "Progress bar will be disabled during training."
+            )
+
+    board_rng = agent_rng = None
+    if seed is not None:
+        board_rng, agent_rng = streams(seed)
+
+    if agent is None:
+        agent = Agent(storage=storage)
+        if resume_from:
+            if not os.path.exists(resume_from):
+                raise FileNotFoundError(f"{resume_from} not found.")
+            agent.load_q_table(resume_from)
+        # Models saved without metadata restart their epsilon schedule
+        if agent.sessions == 0:
+            agent.schedule_epsilon(nb_sessions)
+    if agent_rng is not None:
+        agent.rng = agent_rng
+    if board is None:
+        if recorder is not None:
+            board = RecordingBoard(recorder, board_size, rng=board_rng)
+        else:
+            board = Board(size=board_size, rng=board_rng)
+    elif recorder is not None:
+        raise ValueError(
+            "recorder only records the default board, give a"
+            " recording.RecordingBoard instead."
+        )
+    game_board = board
+
+    as_tuple = agent.state_as_tuple()
+    best_score = 0
+    session = 0
+    try:
+        for session in range(1, nb_sessions + 1):
+            step = 0
+            state = game_board.encode_state(as_tuple)
+            while not game_board.is_gameOver():
+                step += 1
+                t = profiler.start()
+                action = agent.choose_action(state)
+                profiler.stop("action", t)
+                if telemetry:
+                    telemetry.step(game_board, step, DIRECTIONS[action])
+                game_board.get_snake().set_direction(DIRECTIONS[action])
+                t = profiler.start()
+                reward = game_board.update()
+                profiler.stop("update", t)
+                done = game_board.is_gameOver()
+                t = profiler.start()
+                new_state = game_board.encode_state(as_tuple)
+                profiler.stop("vision", t)
+                t = profiler.start()
+                agent.learn(state, action, reward, new_state, done)
+                profiler.stop("learn", t)
+                state = new_state
+                if on_step:
+                    on_step(step, reward)
+
+            score = game_board.get_score()
+            best_score = max(best_score, score)
+            telemetry.session(session, score, step)
+            if profiler:
+                profiler.count("steps", step)
+                profiler.count("sessions")
+                profiler.set("q_table_states", len(agent.q_table))
+                profiler.periodic()
+            if on_session:
+                on_session(session, score)
+            if pbar:
+                pbar.update(1)
+            if checkpointer:
+                checkpointer.maybe_save(agent, session)
+            game_board.reset()
+    except KeyboardInterrupt:
+        if checkpointer:
+            checkpointer.save(agent, session, wait=True)
+        raise
+    finally:
+        telemetry.flush()
+        if recorder is not None:
+            # A game interrupted by an exception has not been reset
+            game_board.finish()
+            recorder.flush()
+        if checkpointer:
+            checkpointer.close()
+
+    if save:
+        if model_path is None:
+            model_path = f"models/q_table_{agent.sessions}.pkl"
+        agent.save_q_table(model_path)
+    if pbar:
+        pbar.close()
+        print("Best Score:", best_score)
+    return agent
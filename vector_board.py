@@ -0,0 +1,284 @@
+# vector_board.py
+import numpy as np
+
+from board import Board
+from occupancy import BODY, EMPTY, GREEN, RED
+
+# Same order as the agent actions and the state tuple: UP, DOWN, LEFT, RIGHT
+DIRECTIONS = np.array([(0, -1), (0, 1), (-1, 0), (1, 0)], dtype=np.int64)
+
+# Food slots, same colors as Board.set_food
+FOOD_COLORS = np.array([RED, GREEN, GREEN], dtype=np.uint8)
+
+
+class VectorBoard:
+    """
+    N independent boards stepped together with NumPy arrays.
+    Follows the rules of Board.update and Board.get_snake_vision.
+    """
+
+    # ATTRIBUTES
+
+    _size: int
+    _nb_games: int
+    _rng: np.random.Generator
+    _grid: np.ndarray       # (N, size*size + 1) cell flags, last = wall
+    _body: np.ndarray       # (N, size*size) ring buffer of flat cells
+    _head: np.ndarray       # (N,) index of the head in the ring buffer
+    _length: np.ndarray     # (N,) snake length
+    _direction: np.ndarray  # (N,) index in DIRECTIONS
+    _food: np.ndarray       # (N, 3) flat cell of each food slot, -1 if none
+    _score: np.ndarray      # (N,)
+    _done: np.ndarray       # (N,)
+
+    # CONSTRUCTOR
+
+    def __init__(self, nb_games: int, size: int = 10, seed=None):
+        """
+        Initialize nb_games boards of the given size.
+        """
+        if size < 6:
+            raise ValueError(
+                f"Unable to place snake on a board of size {size}."
+            )
+        self._size = size
+        self._nb_games = nb_games
+        self._rng = np.random.default_rng(seed)
+
+        cells = size * size
+        self._wall = cells
+        self._grid = np.zeros((nb_games, cells + 1), dtype=np.uint8)
+        self._body = np.zeros((nb_games, cells), dtype=np.int64)
+        self._head = np.zeros(nb_games, dtype=np.int64)
+        self._length = np.zeros(nb_games, dtype=np.int64)
+        self._direction = np.zeros(nb_games, dtype=np.int64)
+        self._food = np.full((nb_games, 3), -1, dtype=np.int64)
+        self._score = np.zeros(nb_games, dtype=np.int64)
+        self._done = np.zeros(nb_games, dtype=bool)
+        self._rows = np.arange(nb_games)
+
+        # Distance -> vision bucket (a ray is never longer than the board)
+        self._buckets = np.array(
+            [Board.simplify_distance(d) for d in range(size + 1)],
+            dtype=np.int8,
+        )
+        self._rays = self._build_rays()
+        self.reset()
+
+    def _build_rays(self) -> np.ndarray:
+        """
+        Precompute, for each cell and direction, the cells seen from it.
+        Cells outside the board point to the wall sentinel.
+        """
+        size = self._size
+        steps = np.arange(1, size + 1)
+        xs = np.arange(size * size) % size
+        ys = np.arange(size * size) // size
+        rays = np.empty((size * size, 4, size), dtype=np.int64)
+        for d, (dx, dy) in enumerate(DIRECTIONS):
+            x = xs[:, None] + steps[None, :] * dx
+            y = ys[:, None] + steps[None, :] * dy
+            inside = (x >= 0) & (x < size) & (y >= 0) & (y < size)
+            rays[:, d, :] = np.where(inside, y * size + x, self._wall)
+        return rays
+
+    # GETTERS
+
+    def get_size(self) -> int:
+        """
+        Get the size of the boards.
+        """
+        return self._size
+
+    def get_nb_games(self) -> int:
+        """
+        Get the number of games simulated together.
+        """
+        return self._nb_games
+
+    def get_scores(self) -> np.ndarray:
+        """
+        Get the current score of every game.
+        """
+        return self._score.copy()
+
+    def get_lengths(self) -> np.ndarray:
+        """
+        Get the current snake length of every game.
+        """
+        return self._length.copy()
+
+    def get_dones(self) -> np.ndarray:
+        """
+        Get the game over flag of every game.
+        """
+        return self._done.copy()
+
+    def get_snake_body(self, game: int) -> list[tuple]:
+        """
+        Get the body of one snake as (x, y) tuples, head first.
+        """
+        cap = self._body.shape[1]
+        idx = (self._head[game] + np.arange(self._length[game])) % cap
+        return [
+            (int(c % self._size), int(c // self._size))
+            for c in self._body[game, idx]
+        ]
+
+    # METHODS
+
+    def reset(self, mask=None) -> np.ndarray:
+        """
+        Start new games where mask is True (all games if mask is None).
+        Return the states of all games.
+        """
+        if mask is None:
+            games = self._rows
+        else:
+            games = np.flatnonzero(mask)
+        if games.size == 0:
+            return self.get_states()
+
+        size = self._size
+        count = games.size
+        self._grid[games, :self._wall] = EMPTY
+        self._grid[:, self._wall] = BODY
+        self._score[games] = 0
+        self._done[games] = False
+
+        # Head inside the same area as Board.set_snake, body behind it
+        direction = self._rng.integers(0, 4, size=count)
+        hx = self._rng.integers(3, size - 2, size=count)
+        hy = self._rng.integers(3, size - 2, size=count)
+        self._direction[games] = direction
+        self._head[games] = 0
+        self._length[games] = 3
+        for i in range(3):
+            x = hx - i * DIRECTIONS[direction, 0]
+            y = hy - i * DIRECTIONS[direction, 1]
+            cell = y * size + x
+            self._body[games, i] = cell
+            self._grid[games, cell] |= BODY
+
+        # Three apples on distinct free cells
+        keys = self._rng.random((count, self._wall))
+        keys[self._grid[games, :self._wall] != EMPTY] = -1.0
+        cells = np.argsort(-keys, axis=1)[:, :3]
+        self._food[games] = cells
+        for slot in range(3):
+            self._grid[games, cells[:, slot]] |= FOOD_COLORS[slot]
+
+        return self.get_states()
+
+    def get_states(self) -> np.ndarray:
+        """
+        Return the (N, 12) batch of states, in the order of
+        get_state_tuple: UP, DOWN, LEFT, RIGHT x (wall, green, red).
+        """
+        heads = self._body[self._rows, self._head]
+        rays = self._rays[heads]
+        values = self._grid[self._rows[:, None, None], rays]
+
+        # The last cell of every ray is outside the board, so argmax
+        # always finds an obstacle.
+        blocked = (values & BODY) != 0
+        wall_idx = blocked.argmax(axis=2)
+        visible = np.arange(self._size) < wall_idx[..., None]
+
+        vision = np.empty((self._nb_games, 4, 3), dtype=np.int8)
+        vision[..., 0] = self._buckets[wall_idx + 1]
+        for k, flag in ((1, GREEN), (2, RED)):
+            seen = ((values & flag) != 0) & visible
+            distance = np.where(seen.any(axis=2), seen.argmax(axis=2) + 1, 0)
+            vision[..., k] = self._buckets[distance]
+        return vision.reshape(self._nb_games, 12)
+
+    def step(self, actions) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Apply one action (0: UP, 1: DOWN, 2: LEFT, 3: RIGHT) to every game.
+        Finished games are left untouched until reset.
+        Return (states, rewards, dones).
+        """
+        size = self._size
+        cap = self._body.shape[1]
+        actions = np.asarray(actions, dtype=np.int64)
+        rewards = np.zeros(self._nb_games, dtype=np.int64)
+        active = ~self._done
+
+        # A reverse move is ignored, like Snake.set_direction
+        turn = active & (actions != (self._direction ^ 1))
+        self._direction[turn] = actions[turn]
+
+        heads = self._body[self._rows, self._head]
+        nx = heads % size + DIRECTIONS[self._direction, 0]
+        ny = heads // size + DIRECTIONS[self._direction, 1]
+        inside = (nx >= 0) & (nx < size) & (ny >= 0) & (ny < size)
+        target = np.where(inside, ny * size + nx, self._wall)
+        cell = self._grid[self._rows, target]
+
+        crash = active & ((cell & BODY) != 0)
+        rewards[crash] = -100
+        self._done[crash] = True
+
+        moving = active & ~crash
+        green = moving & ((cell & GREEN) != 0)
+        red = moving & ((cell & RED) != 0)
+        rewards[green] = 10
+        self._score[green] += 10
+        rewards[red] = -15
+        self._score[red] -= 10
+
+        # Red apple: lose the tail, or die if nothing is left
+        starve = red & (self._length <= 1)
+        self._pop_tail(red & ~starve)
+
+        eaten = np.flatnonzero(green | red)
+        if eaten.size:
+            self._respawn(eaten, target[eaten], rewards)
+
+        alive = moving & ~starve
+        self._done[starve] = True
+        games = np.flatnonzero(alive)
+        self._head[games] = (self._head[games] - 1) % cap
+        self._body[games, self._head[games]] = target[games]
+        self._grid[games, target[games]] |= BODY
+        self._length[games] += 1
+        self._pop_tail(alive & ~green)
+
+        rewards[active & (rewards == 0)] = -1
+        return self.get_states(), rewards, self._done.copy()
+
+    def _pop_tail(self, mask: np.ndarray):
+        """
+        Remove the last segment of the snakes selected by mask.
+        """
+        games = np.flatnonzero(mask)
+        if games.size == 0:
+            return
+        cap = self._body.shape[1]
+        tail = (self._head[games] + self._length[games] - 1) % cap
+        self._grid[games, self._body[games, tail]] &= ~np.uint8(BODY)
+        self._length[games] -= 1
+
+    def _respawn(self, games, eaten_cells, rewards):
+        """
+        Replace the eaten apples by apples of the same color on free
+        cells. A game without free cell is won, like Board.update.
+        """
+        slots = (self._food[games] == eaten_cells[:, None]).argmax(axis=1)
+        colors = FOOD_COLORS[slots]
+        self._grid[games, eaten_cells] &= ~colors
+
+        grid = self._grid[games, :self._wall]
+        keys = self._rng.random(grid.shape)
+        keys[grid != EMPTY] = -1.0
+        cells = keys.argmax(axis=1)
+        full = keys[np.arange(games.size), cells] < 0
+
+        placed = ~full
+        self._grid[games[placed], cells[placed]] |= colors[placed]
+        self._food[games, slots] = np.where(placed, cells, -1)
+
+        won = games[full]
+        self._done[won] = True
+        rewards[won] = 1000